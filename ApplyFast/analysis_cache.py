@@ -0,0 +1,181 @@
+"""
+Analysis Cache - Content-addressed cache for /analyze-job results
+
+Two tiers: an in-process LRU in front of a SQLite table that lives in the
+same database as the applications table. Entries are keyed by a hash of the
+normalized job text plus the analyze prompt/schema version, so bumping the
+version invalidates every stored analysis without touching the table.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, ContextManager, Dict, Optional
+
+
+def normalize_job_text(job_text: str) -> str:
+    """
+    Normalize scraped job text so trivial differences don't defeat the cache.
+
+    Collapses all whitespace runs and lowercases the text - re-scrapes of the
+    same posting differ mostly in layout whitespace.
+    """
+    return re.sub(r"\s+", " ", job_text).strip().lower()
+
+
+def make_cache_key(job_text: str, version: str) -> str:
+    """
+    Build the content address for a job posting under a prompt/schema version.
+    """
+    digest = hashlib.sha256()
+    digest.update(version.encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(normalize_job_text(job_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier (memory LRU + SQLite) cache with TTL and size-based eviction.
+
+    Args:
+        get_db: Context manager factory yielding a sqlite3 connection
+        ttl_seconds: Entries older than this are treated as misses and purged
+        max_entries: Maximum rows kept in SQLite (least recently used evicted)
+        memory_entries: Maximum entries kept in the in-process LRU
+    """
+
+    def __init__(
+        self,
+        get_db: Callable[[], ContextManager[Any]],
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        memory_entries: int = 512
+    ):
+        self._get_db = get_db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis, checking memory first and then SQLite.
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        with self._get_db() as conn:
+            row = conn.execute(
+                "SELECT result, created_at FROM analysis_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or now - row["created_at"] >= self.ttl_seconds:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE analysis_cache SET last_accessed = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            conn.commit()
+
+        value = json.loads(row["result"])
+        with self._lock:
+            self.db_hits += 1
+            self._remember(key, row["created_at"], value)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store an analysis in both tiers and enforce TTL and size limits.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, now, value)
+
+        with self._get_db() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO analysis_cache
+                (cache_key, result, created_at, last_accessed)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, json.dumps(value), now, now)
+            )
+
+            # Drop expired rows, then trim least recently used past the size cap
+            expired = conn.execute(
+                "DELETE FROM analysis_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            ).rowcount
+            count = conn.execute("SELECT COUNT(*) AS count FROM analysis_cache").fetchone()["count"]
+            overflow = count - self.max_entries
+            trimmed = 0
+            if overflow > 0:
+                trimmed = conn.execute(
+                    """
+                    DELETE FROM analysis_cache WHERE cache_key IN (
+                        SELECT cache_key FROM analysis_cache
+                        ORDER BY last_accessed ASC
+                        LIMIT ?
+                    )
+                    """,
+                    (overflow,)
+                ).rowcount
+            conn.commit()
+
+        with self._lock:
+            self.evictions += expired + trimmed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and tier sizes for observability.
+        """
+        with self._get_db() as conn:
+            db_entries = conn.execute("SELECT COUNT(*) AS count FROM analysis_cache").fetchone()["count"]
+
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memoryHits": self.memory_hits,
+                "dbHits": self.db_hits,
+                "misses": self.misses,
+                "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "memoryEntries": len(self._memory),
+                "dbEntries": db_entries,
+                "ttlSeconds": self.ttl_seconds,
+                "maxEntries": self.max_entries
+            }
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        """Insert into the memory LRU (caller holds the lock)."""
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,385 @@
+"""
+Answer Store - Reuse answers to screening questions seen on earlier applications
+
+Most application forms ask the same few questions in slightly different words
+("Why do you want to work at Acme?", "Are you legally authorized to work in
+the US? *"). Every answer Claude gives (other than "manual") is kept in the
+answer_store table, keyed by a hash of the user profile and the normalized
+question, and a later question close enough to a stored one is answered from
+the store instead of calling Claude.
+
+Questions are normalized (lowercased, punctuation dropped, the company name
+and job title replaced by placeholders) and compared by Jaccard similarity of
+their character 3-gram shingles; a match needs ANSWER_STORE_SIMILARITY
+(default 0.85) and the same numbers ("3+ years" is not "5+ years"). Stored
+answers have the company and title swapped for {{company}} / {{title}} and
+filled back in for the new job, so "I'd love to join Acme" becomes "I'd love
+to join Globex". Only an identical question asked again for the same company
+keeps the stored confidence; near matches and answers learned for another
+company come back as "review", so they are never auto-submitted elsewhere.
+
+Overrides are answers the user writes, for one company or for all of them.
+They apply to every profile, win over learned answers and are never evicted.
+Learned answers expire after ANSWER_STORE_TTL_SECONDS and are trimmed least
+recently used past ANSWER_STORE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, ContextManager, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+COMPANY_PLACEHOLDER = "{{company}}"
+TITLE_PLACEHOLDER = "{{title}}"
+
+# Filled in when the job context doesn't name the company or title
+COMPANY_FALLBACK = "your company"
+TITLE_FALLBACK = "this role"
+
+SHINGLE_SIZE = 3
+
+SOURCE_CLAUDE = "claude"
+SOURCE_OVERRIDE = "override"
+
+# Generic references to the employer, compared as if they named it
+_COMPANY_REFERENCES = re.compile(r"\b(?:our|this|your) (?:company|organization|organisation)\b")
+_REQUIRED_SUFFIX = re.compile(r"(?: required)+$")
+
+
+def profile_key(user_profile: Dict[str, Any]) -> str:
+    """Stable hash of a user profile; editing the profile starts a fresh set of learned answers."""
+    return hashlib.sha256(json.dumps(user_profile, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def normalize_company(company: Optional[str]) -> str:
+    """Lowercase, punctuation-free company name ('' when missing)."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", (company or "").lower()).split())
+
+
+def _replace_name(text: str, name: Optional[str], replacement: str) -> str:
+    """Replace whole-word occurrences of `name` (case-insensitive) in `text`."""
+    name = (name or "").strip()
+    if not name:
+        return text
+    return re.sub(rf"(?<!\w){re.escape(name)}(?!\w)", lambda _: replacement, text, flags=re.IGNORECASE)
+
+
+def normalize_question(question: str, job_context: Dict[str, Any]) -> str:
+    """
+    Reduce a question to the text compared for similarity.
+
+    The job's company and title become "company" / "title", "(required)" and
+    punctuation are dropped and whitespace is collapsed.
+    """
+    text = _replace_name(question, job_context.get("company"), " company ")
+    text = _replace_name(text, job_context.get("title"), " title ")
+    text = _COMPANY_REFERENCES.sub(" company ", text.lower())
+    text = " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+    return _REQUIRED_SUFFIX.sub("", text)
+
+
+@lru_cache(maxsize=4096)
+def shingles(normalized: str) -> FrozenSet[str]:
+    """Character 3-grams of a normalized question, padded so word boundaries count."""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1)))
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two normalized questions' shingle sets."""
+    if a == b:
+        return 1.0
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def _numbers(normalized: str) -> FrozenSet[str]:
+    return frozenset(re.findall(r"\d+", normalized))
+
+
+def templatize_answer(answer: str, job_context: Dict[str, Any]) -> str:
+    """Swap the job's company name and title in an answer for placeholders."""
+    answer = _replace_name(answer, job_context.get("company"), COMPANY_PLACEHOLDER)
+    return _replace_name(answer, job_context.get("title"), TITLE_PLACEHOLDER)
+
+
+def fill_answer(template: str, job_context: Dict[str, Any]) -> str:
+    """Fill a stored answer's placeholders in for a new job."""
+    return (
+        template
+        .replace(COMPANY_PLACEHOLDER, (job_context.get("company") or "").strip() or COMPANY_FALLBACK)
+        .replace(TITLE_PLACEHOLDER, (job_context.get("title") or "").strip() or TITLE_FALLBACK)
+    )
+
+
+class AnswerStore:
+    """
+    SQLite-backed store of screening-question answers, matched by similarity.
+
+    Args:
+        get_db: Context manager factory yielding a sqlite3 connection
+        threshold: Minimum shingle Jaccard similarity for a stored answer to be reused
+        ttl_seconds: Learned answers older than this are ignored and purged
+        max_entries: Maximum learned answers kept (least recently used evicted)
+    """
+
+    def __init__(
+        self,
+        get_db: Callable[[], ContextManager[Any]],
+        threshold: float = 0.85,
+        ttl_seconds: float = 90 * 24 * 3600,
+        max_entries: int = 5000
+    ):
+        self._get_db = get_db
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.override_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evictions = 0
+
+    def lookup(
+        self,
+        questions: Sequence[str],
+        user_profile: Dict[str, Any],
+        job_context: Dict[str, Any]
+    ) -> List[Optional[Dict[str, str]]]:
+        """
+        Find reusable answers for the questions on one form.
+
+        Overrides for this company win over overrides for every company, which
+        win over the profile's learned answers; within each, the most similar
+        stored question wins.
+
+        Returns:
+            One entry per question: {"answer", "confidence"} adapted to this
+            job, or None when nothing stored is similar enough
+        """
+        if not questions:
+            return []
+        now = time.time()
+        company = normalize_company(job_context.get("company"))
+
+        with self._get_db() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, company, question, answer, confidence, source FROM answer_store
+                WHERE (profile_key = ? AND created_at >= ?)
+                   OR (profile_key = '' AND company IN ('', ?))
+                """,
+                (profile_key(user_profile), now - self.ttl_seconds, company)
+            ).fetchall()
+
+        results: List[Optional[Dict[str, str]]] = []
+        used: List[int] = []
+        for question in questions:
+            normalized = normalize_question(question, job_context)
+            match = self._best_match(normalized, rows, company) if normalized else None
+            if match is None:
+                results.append(None)
+                with self._lock:
+                    self.misses += 1
+                continue
+
+            row, score = match
+            if row["source"] == SOURCE_OVERRIDE:
+                confidence, counter = "auto", "override_hits"
+            elif score >= 1.0 and company and row["company"] == company:
+                confidence, counter = row["confidence"], "exact_hits"
+            else:
+                # A reworded question, or an answer written for another employer,
+                # may not fit - have the applicant check it
+                confidence = "review"
+                counter = "exact_hits" if score >= 1.0 else "similar_hits"
+            results.append({"answer": fill_answer(row["answer"], job_context), "confidence": confidence})
+            used.append(row["id"])
+            with self._lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+        if used:
+            with self._get_db() as conn:
+                conn.executemany(
+                    "UPDATE answer_store SET hits = hits + 1, last_used = ? WHERE id = ?",
+                    [(now, row_id) for row_id in used]
+                )
+                conn.commit()
+        return results
+
+    def _best_match(self, normalized: str, rows: List[Any], company: str) -> Optional[Tuple[Any, float]]:
+        """
+        Highest-priority, then most similar, row at or above the threshold;
+        among equally similar learned answers, one learned for `company`.
+        """
+        numbers = _numbers(normalized)
+        best, best_rank = None, None
+        for row in rows:
+            score = similarity(normalized, row["question"])
+            if score < self.threshold or _numbers(row["question"]) != numbers:
+                continue
+            # Company override (2) > any-company override (1) > learned answer (0)
+            priority = (2 if row["company"] else 1) if row["source"] == SOURCE_OVERRIDE else 0
+            rank = (priority, score, row["company"] == company)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = (row, score), rank
+        return best
+
+    def remember(
+        self,
+        answers: Sequence[Tuple[str, str, str]],
+        user_profile: Dict[str, Any],
+        job_context: Dict[str, Any]
+    ) -> None:
+        """
+        Store Claude's answers for reuse, then enforce TTL and size limits.
+        Each answer records the job's company, which decides whether a later
+        exact match may keep its confidence.
+
+        Args:
+            answers: (question, answer, confidence) tuples; "manual" answers are skipped
+        """
+        now = time.time()
+        key = profile_key(user_profile)
+        company = normalize_company(job_context.get("company"))
+        rows = [
+            (key, company, normalized, templatize_answer(answer, job_context), confidence, SOURCE_CLAUDE, now, now)
+            for normalized, answer, confidence in (
+                (normalize_question(question, job_context), answer, confidence)
+                for question, answer, confidence in answers
+            )
+            if normalized and confidence != "manual" and answer.strip()
+        ]
+        if not rows:
+            return
+
+        with self._get_db() as conn:
+            conn.executemany(
+                """
+                INSERT INTO answer_store
+                (profile_key, company, question, answer, confidence, source, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (profile_key, company, question) DO UPDATE SET
+                    answer = excluded.answer,
+                    confidence = excluded.confidence,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+                """,
+                rows
+            )
+
+            # Drop expired answers, then trim least recently used past the size cap
+            expired = conn.execute(
+                "DELETE FROM answer_store WHERE source = ? AND created_at < ?",
+                (SOURCE_CLAUDE, now - self.ttl_seconds)
+            ).rowcount
+            count = conn.execute(
+                "SELECT COUNT(*) AS count FROM answer_store WHERE source = ?", (SOURCE_CLAUDE,)
+            ).fetchone()["count"]
+            overflow = count - self.max_entries
+            trimmed = 0
+            if overflow > 0:
+                trimmed = conn.execute(
+                    """
+                    DELETE FROM answer_store WHERE id IN (
+                        SELECT id FROM answer_store WHERE source = ?
+                        ORDER BY last_used ASC
+                        LIMIT ?
+                    )
+                    """,
+                    (SOURCE_CLAUDE, overflow)
+                ).rowcount
+            conn.commit()
+
+        with self._lock:
+            self.stored += len(rows)
+            self.evictions += expired + trimmed
+
+    def set_override(self, question: str, answer: str, company: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add or replace the user's own answer to a question, for one company or
+        (company None) for all of them. The answer may use {{company}} and
+        {{title}} placeholders.
+        """
+        now = time.time()
+        company_key = normalize_company(company)
+        normalized = normalize_question(question, {"company": company})
+        with self._get_db() as conn:
+            conn.execute(
+                """
+                INSERT INTO answer_store
+                (profile_key, company, question, answer, confidence, source, created_at, last_used)
+                VALUES ('', ?, ?, ?, 'auto', ?, ?, ?)
+                ON CONFLICT (profile_key, company, question) DO UPDATE SET
+                    answer = excluded.answer,
+                    created_at = excluded.created_at
+                """,
+                (company_key, normalized, answer, SOURCE_OVERRIDE, now, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM answer_store WHERE profile_key = '' AND company = ? AND question = ?",
+                (company_key, normalized)
+            ).fetchone()
+            conn.commit()
+        return _override_dict(row)
+
+    def list_overrides(self) -> List[Dict[str, Any]]:
+        with self._get_db() as conn:
+            rows = conn.execute(
+                "SELECT * FROM answer_store WHERE source = ? ORDER BY company, question", (SOURCE_OVERRIDE,)
+            ).fetchall()
+        return [_override_dict(row) for row in rows]
+
+    def delete_override(self, override_id: int) -> bool:
+        """Returns False when no override has that id."""
+        with self._get_db() as conn:
+            deleted = conn.execute(
+                "DELETE FROM answer_store WHERE id = ? AND source = ?", (override_id, SOURCE_OVERRIDE)
+            ).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and entry counts for observability.
+        """
+        with self._get_db() as conn:
+            counts = {
+                row["source"]: row["count"]
+                for row in conn.execute("SELECT source, COUNT(*) AS count FROM answer_store GROUP BY source")
+            }
+
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits + self.override_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "exactHits": self.exact_hits,
+                "similarHits": self.similar_hits,
+                "overrideHits": self.override_hits,
+                "misses": self.misses,
+                "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+                "stored": self.stored,
+                "evictions": self.evictions,
+                "entries": counts.get(SOURCE_CLAUDE, 0),
+                "overrides": counts.get(SOURCE_OVERRIDE, 0),
+                "threshold": self.threshold,
+                "ttlSeconds": self.ttl_seconds,
+                "maxEntries": self.max_entries
+            }
+
+
+def _override_dict(row: Any) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "company": row["company"] or None,
+        "question": row["question"],
+        "answer": row["answer"],
+        "hits": row["hits"]
+    }
@@ -4,81 +4,174 @@ Runs on localhost:8000
 """
 
 import os
+import io
+import csv
+import time
+import base64
+import asyncio
 import sqlite3
 import json
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from contextlib import contextmanager
+from typing import Optional, Dict, Any, Callable, List, Literal, Tuple, Union
+from contextlib import asynccontextmanager, contextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-import anthropic
 from dotenv import load_dotenv
-from resume_generator import generate_resume_with_analysis
 
-# Load environment variables
+# Load environment variables before the local imports below: llm_clients, resilience,
+# llm_scheduler and model_router read their settings from the environment at import
 load_dotenv()
 
-# Initialize FastAPI app
-app = FastAPI(title="ApplyFast API", version="1.0.0")
-
-# Add CORS middleware to allow Chrome extension to call API
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, restrict to your extension ID
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+from resume_generator import generate_resume_with_analysis_async, stream_resume_with_analysis, resume_flight
+from analysis_cache import AnalysisCache, make_cache_key
+from answer_store import AnswerStore
+from db_pool import SQLitePool
+from singleflight import SingleFlight, make_flight_key
+from metrics import (
+    CLAUDE_FALLBACKS, HTTP_IN_FLIGHT, HTTP_REQUESTS, HTTP_REQUEST_SECONDS, JSON_PARSE_FAILURES, JSON_REPAIRS,
+    SQLITE_QUERY_SECONDS,
+    compaction_snapshot, record_compaction, record_usage, register_collector, render_prometheus,
+    track_claude_call, usage_snapshot
+)
+from job_extract import extract_job_fields, low_confidence_fields
+from job_compaction import CompactionResult, compact_job_text
+from migrations import APPLICATIONS_FTS_TABLE, has_table, migrate
+from url_canon import canonicalize_job_url
+from fast_json import FastJSONResponse, encode_array, encode_row
+from json_repair import repair_json
+from llm_clients import aclose_clients, get_api_key, get_async_client
+from resilience import CALL_SITE_DEADLINES, ClaudeUnavailableError, call_with_resilience, claude_breaker
+from llm_scheduler import LANE_BULK, LANE_INTERACTIVE, Reservation, estimate_request_tokens, llm_scheduler
+from model_router import (
+    STRONG_MODEL, call_with_escalation, choose_model, record_escalation, record_route_call, route_snapshot,
+    strip_short_cache_breakpoints
 )
 
-# Initialize Anthropic client
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-if not ANTHROPIC_API_KEY:
-    raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+# Endpoints register on this router; create_app() (bottom of the file) mounts it
+router = APIRouter()
+
+
+async def record_http_metrics(request: Request, call_next):
+    """Per-endpoint request counts, latency histograms and the in-flight gauge"""
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        # Label by route template (/applications/{application_id}) to keep cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route_path)
+        HTTP_REQUESTS.inc(method=request.method, route=route_path, status=status)
+
+# Default (strong) model; model_router.py picks a faster one where it can
+CLAUDE_MODEL = STRONG_MODEL
 
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+# Coalesces concurrent identical prompts (e.g. several tabs analyzing the same posting)
+claude_flight = SingleFlight("call_claude")
 
 # Database file
 DB_FILE = "applyfast.db"
 
+# Set by init_database() once migrations have run
+applications_fts_enabled = False
+
+# Bump whenever the analyze prompt or AnalyzeJobResponse schema changes so
+# cached analyses produced by the old prompt are no longer served
+ANALYZE_PROMPT_VERSION = "analyze-v2"
+
+# Estimated-token budget for the job text inside analyze prompts (0 disables)
+ANALYZE_TOKEN_BUDGET = int(os.getenv("ANALYZE_TOKEN_BUDGET", 2000))
+
+# Heuristic fields at or above this confidence are not re-asked in hybrid mode
+HYBRID_CONFIDENCE_THRESHOLD = float(os.getenv("HYBRID_CONFIDENCE_THRESHOLD", 0.7))
+
+# Default and maximum number of Claude calls /analyze-jobs runs at once
+ANALYZE_BATCH_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_CONCURRENCY", 8))
+ANALYZE_BATCH_MAX_CONCURRENCY = int(os.getenv("ANALYZE_BATCH_MAX_CONCURRENCY", 32))
+
+# Rows fetched from SQLite per chunk written by /applications/export
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 1000))
+
+# Most questions /answer-questions answers in one call, and the output tokens allowed per question
+ANSWER_QUESTIONS_MAX = int(os.getenv("ANSWER_QUESTIONS_MAX", 25))
+ANSWER_TOKENS_PER_QUESTION = 600
+
+# The answer endpoints skip an escalation or re-ask with less than this much of
+# their request budget (CALL_SITE_DEADLINES) left
+ANSWER_RETRY_MIN_SECONDS = float(os.getenv("ANSWER_RETRY_MIN_SECONDS", 10))
+
+# Largest batch /log-applications and /applications/lookup accept in one request
+LOG_APPLICATIONS_MAX_BATCH = int(os.getenv("LOG_APPLICATIONS_MAX_BATCH", 5000))
+
 
 # ══════════════════════════════════════════════════════════════════
 #  DATABASE SETUP
 # ══════════════════════════════════════════════════════════════════
 
 def init_database():
-    """Initialize SQLite database with applications table"""
+    """Bring applyfast.db up to the latest schema version (see migrations.py)"""
+    global applications_fts_enabled
     with get_db() as conn:
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                job_url TEXT NOT NULL,
-                company TEXT,
-                title TEXT,
-                status TEXT,
-                resume_used TEXT,
-                timestamp TEXT NOT NULL,
-                metadata TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        conn.commit()
+        migrate(conn)
+        applications_fts_enabled = has_table(conn, APPLICATIONS_FTS_TABLE)
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that records statement timings in the metrics module"""
+
+    def execute(self, sql, *args):
+        with SQLITE_QUERY_SECONDS.time(operation=_sql_operation(sql)):
+            return super().execute(sql, *args)
+
+    def executemany(self, sql, *args):
+        with SQLITE_QUERY_SECONDS.time(operation=_sql_operation(sql)):
+            return super().executemany(sql, *args)
+
+
+def _sql_operation(sql: str) -> str:
+    """First keyword of a statement (SELECT, INSERT, ...) for metric labels"""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+# One reusable WAL-mode connection per thread (see db_pool.py)
+db_pool = SQLitePool(DB_FILE, factory=TimedConnection)
 
 
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
+    """Context manager for database connections (borrowed from the per-thread pool)"""
+    conn = db_pool.connection()
     try:
         yield conn
     finally:
-        conn.close()
+        db_pool.release(conn)
 
 
-# Initialize database on startup
-init_database()
+# Cache for /analyze-job results (memory LRU in front of the analysis_cache table)
+analysis_cache = AnalysisCache(
+    get_db,
+    ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", 5000)),
+    memory_entries=int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", 512))
+)
+
+# Screening-question answers reused for near-duplicate questions (answer_store table)
+answer_store = AnswerStore(
+    get_db,
+    threshold=float(os.getenv("ANSWER_STORE_SIMILARITY", 0.85)),
+    ttl_seconds=float(os.getenv("ANSWER_STORE_TTL_SECONDS", 90 * 24 * 3600)),
+    max_entries=int(os.getenv("ANSWER_STORE_MAX_ENTRIES", 5000))
+)
 
 
 # ══════════════════════════════════════════════════════════════════
@@ -88,6 +181,14 @@ init_database()
 class AnalyzeJobRequest(BaseModel):
     jobUrl: str
     jobText: str
+    # "llm": full Claude analysis, "fast": local heuristics only,
+    # "hybrid": heuristics + Claude for the fields they couldn't fill confidently
+    mode: Literal["fast", "hybrid", "llm"] = "llm"
+
+
+class AnalyzeJobsRequest(BaseModel):
+    jobs: List[AnalyzeJobRequest]
+    concurrency: Optional[int] = None  # Defaults to ANALYZE_BATCH_CONCURRENCY
 
 
 class AnalyzeJobResponse(BaseModel):
@@ -121,7 +222,47 @@ class AnswerQuestionRequest(BaseModel):
 
 class AnswerQuestionResponse(BaseModel):
     answer: str
-    confidence: str  # "auto", "review", or "manual"
+    confidence: Literal["auto", "review", "manual"]
+
+
+class ScreeningQuestion(BaseModel):
+    fieldId: str  # Form field the answer goes into; keys the response
+    question: str
+
+
+class AnswerQuestionsRequest(BaseModel):
+    questions: List[ScreeningQuestion]
+    userProfile: Dict[str, Any]
+    jobContext: Dict[str, Any]
+
+
+class QuestionAnswer(BaseModel):
+    fieldId: str
+    answer: str
+    confidence: Literal["auto", "review", "manual"]
+
+
+# Input schema of the record_answers tool (a docstring would leak into the schema)
+class QuestionAnswers(BaseModel):
+    answers: List[QuestionAnswer]
+
+
+class AnswerQuestionsResponse(BaseModel):
+    answers: Dict[str, AnswerQuestionResponse]  # Keyed by fieldId
+
+
+class AnswerOverrideRequest(BaseModel):
+    question: str
+    answer: str  # May use {{company}} / {{title}} placeholders
+    company: Optional[str] = None  # None: every company
+
+
+class AnswerOverride(BaseModel):
+    id: int
+    company: Optional[str]
+    question: str  # Normalized (see answer_store.normalize_question)
+    answer: str
+    hits: int
 
 
 class LogApplicationRequest(BaseModel):
@@ -137,6 +278,33 @@ class LogApplicationRequest(BaseModel):
 class LogApplicationResponse(BaseModel):
     success: bool
     applicationId: int
+    alreadyLogged: bool = False  # True when an existing application for the same job was updated
+
+
+class LogApplicationsRequest(BaseModel):
+    applications: List[LogApplicationRequest]
+
+
+class LogApplicationsResponse(BaseModel):
+    success: bool
+    applicationIds: List[int]  # Same order as the request
+    alreadyLogged: List[bool]
+
+
+class LookupApplicationsRequest(BaseModel):
+    jobUrls: List[str]
+
+
+class ApplicationLookup(BaseModel):
+    jobUrl: str
+    canonicalUrl: Optional[str]
+    applied: bool
+    applicationId: Optional[int] = None
+    status: Optional[str] = None
+
+
+class LookupApplicationsResponse(BaseModel):
+    results: List[ApplicationLookup]  # Same order as the request
 
 
 class Application(BaseModel):
@@ -155,32 +323,152 @@ class Application(BaseModel):
 #  HELPER FUNCTIONS
 # ══════════════════════════════════════════════════════════════════
 
-def call_claude(prompt: str, max_tokens: int = 2000) -> str:
+async def call_claude(
+    prompt: Union[str, List[Dict[str, Any]]],
+    max_tokens: int = 2000,
+    system: Optional[List[Dict[str, Any]]] = None,
+    call_site: str = "call_claude",
+    deadline: Optional[float] = None,
+    lane: str = LANE_INTERACTIVE,
+    model: str = CLAUDE_MODEL,
+    tool: Optional[Dict[str, Any]] = None
+) -> Union[str, Dict[str, Any]]:
     """
-    Call Claude API with a prompt and return the response text
+    Call Claude API with a prompt and return the response text, or with
+    `tool` the input of the tool call Claude is made to answer with.
+    Identical prompts already in flight on the same lane share a single
+    upstream call, which waits its turn in the LLM scheduler (see
+    llm_scheduler.py) and is retried with backoff on rate limits and
+    overload (see resilience.py).
+
+    Args:
+        prompt: User message as a string or a list of content blocks
+        max_tokens: Completion token limit
+        system: Optional system content blocks (may carry cache_control breakpoints,
+            kept only where the prefix is long enough for `model` to cache)
+        call_site: Label used when recording token usage
+        deadline: Seconds the whole call may take, scheduler queue included;
+            without one, the call site's default from resilience.py applies
+            to the attempts only
+        lane: Scheduler priority lane ("interactive" or "bulk")
+        model: Claude model (see model_router.choose_model)
+        tool: Tool definition (see schema_tool) forcing schema-shaped output
+
+    Raises:
+        ClaudeUnavailableError: Upstream is degraded (circuit open or retries exhausted)
     """
+    # The API ignores breakpoints on prefixes too short for the model to cache
+    system, prompt = strip_short_cache_breakpoints(model, system, prompt, [tool] if tool else None)
+
+    # Only send system when given (the SDK rejects an explicit None)
+    system_kwargs = {"system": system} if system is not None else {}
+    if tool is not None:
+        system_kwargs.update(tools=[tool], tool_choice={"type": "tool", "name": tool["name"]})
+
+    async def create(reservation: Reservation) -> Union[str, Dict[str, Any]]:
+        # Shared client, built on first use - endpoints await Claude on the event
+        # loop instead of pinning a threadpool thread for the whole completion
+        client = get_async_client()
+        start = time.perf_counter()
+        with track_claude_call(call_site):
+            message = await client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                **system_kwargs
+            )
+        record_usage(call_site, message.usage)
+        record_route_call(call_site, model, time.perf_counter() - start, message.usage)
+        reservation.settle(message.usage)
+        return message_output(message)
+
+    async def scheduled() -> Union[str, Dict[str, Any]]:
+        # Admitted once per call; retries and hedges reuse the reservation
+        tokens = estimate_request_tokens(prompt, system, max_tokens)
+        started = time.monotonic()
+        async with llm_scheduler.reserve(lane, tokens, timeout=deadline) as reservation:
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0:
+                raise ClaudeUnavailableError(f"No time left for {call_site} after queueing")
+            return await call_with_resilience(lambda: create(reservation), call_site, deadline=remaining)
+
+    if deadline is not None and deadline <= 0:
+        raise ClaudeUnavailableError(f"No time left for {call_site}")
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=max_tokens,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        )
-        return message.content[0].text
+        # The lane is part of the key: an interactive call must not join a flight
+        # still queued behind the bulk lane's headroom and queue position
+        flight_key = make_flight_key(model, max_tokens, system, prompt, tool and tool["name"], lane)
+        flight = claude_flight.do(flight_key, scheduled)
+        # A caller that joined someone else's flight still gives up at its own deadline
+        return await (flight if deadline is None else asyncio.wait_for(flight, deadline))
+    except ClaudeUnavailableError:
+        # Endpoints fall back to cached/heuristic results, or claude_unavailable_handler returns a 503
+        raise
+    except asyncio.TimeoutError:
+        raise ClaudeUnavailableError(f"{call_site} did not finish within {deadline:.1f}s")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Claude API error: {str(e)}")
 
 
-def parse_json_response(response_text: str) -> Dict[str, Any]:
+def schema_tool(name: str, description: str, model: type, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """
-    Parse JSON from Claude's response, handling markdown code blocks
+    Tool definition whose input schema is a Pydantic model's JSON schema.
+    Forcing Claude to call it returns output already parsed and shaped like
+    the model instead of free text that may not be valid JSON.
+
+    Args:
+        name: Tool name
+        description: What the tool records
+        model: Pydantic model the input must match
+        fields: Only these properties (for partial extractions)
     """
+    schema = model.model_json_schema()
+    schema.pop("title", None)
+    definitions = schema.pop("$defs", {})
+    if definitions:
+        schema = _inline_refs(schema, definitions)
+    if fields is not None:
+        schema["properties"] = {field: schema["properties"][field] for field in fields}
+        schema["required"] = [field for field in schema.get("required", []) if field in fields]
+    return {"name": name, "description": description, "input_schema": schema}
+
+
+def _inline_refs(node: Any, definitions: Dict[str, Any]) -> Any:
+    """Replace "$ref": "#/$defs/Name" with the definition, for a self-contained tool schema"""
+    if isinstance(node, dict):
+        if "$ref" in node:
+            node = definitions[node["$ref"].rsplit("/", 1)[-1]]
+        return {key: _inline_refs(value, definitions) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline_refs(item, definitions) for item in node]
+    return node
+
+
+def message_output(message: Any) -> Union[str, Dict[str, Any]]:
+    """The input of a message's tool call if it made one, else its text"""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use":
+            return block.input
+    return "".join(block.text for block in message.content if getattr(block, "type", None) == "text")
+
+
+def parse_json_response(response: Union[str, Dict[str, Any]], call_site: str = "unknown") -> Dict[str, Any]:
+    """
+    Parse JSON from Claude's response, handling markdown code blocks.
+
+    Tool-call input (a dict) is already parsed and returned as is. Text that
+    isn't valid JSON goes through json_repair before it counts as a failure.
+    """
+    if isinstance(response, dict):
+        return response
+
     # Remove markdown code blocks if present
-    text = response_text.strip()
+    text = response.strip()
     if text.startswith("```json"):
         text = text[7:]
     elif text.startswith("```"):
@@ -194,17 +482,28 @@ def parse_json_response(response_text: str) -> Dict[str, Any]:
     try:
         return json.loads(text)
     except json.JSONDecodeError as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to parse Claude response as JSON: {str(e)}\nResponse: {response_text[:500]}"
-        )
+        error = e
+
+    try:
+        repaired = repair_json(response)
+    except ValueError:
+        repaired = None
+    if isinstance(repaired, dict):
+        JSON_REPAIRS.inc(call_site=call_site)
+        return repaired
+
+    JSON_PARSE_FAILURES.inc(call_site=call_site)
+    raise HTTPException(
+        status_code=500,
+        detail=f"Failed to parse Claude response as JSON: {str(error)}\nResponse: {response[:500]}"
+    )
 
 
 # ══════════════════════════════════════════════════════════════════
 #  API ENDPOINTS
 # ══════════════════════════════════════════════════════════════════
 
-@app.get("/")
+@router.get("/")
 def root():
     """Health check endpoint"""
     return {
@@ -214,17 +513,16 @@ def root():
     }
 
 
-@app.post("/analyze-job", response_model=AnalyzeJobResponse)
-def analyze_job(request: AnalyzeJobRequest):
+def build_analyze_prompt(job_url: str, job_text: str) -> str:
     """
-    Analyze a job posting and extract structured requirements using Claude
+    Build the Claude prompt that extracts structured requirements from a posting
     """
-    prompt = f"""Analyze this job posting and extract structured information. Return ONLY valid JSON with no additional text.
+    return f"""Analyze this job posting and extract structured information. Return ONLY valid JSON with no additional text.
 
-Job URL: {request.jobUrl}
+Job URL: {job_url}
 
 Job Text:
-{request.jobText}
+{job_text}
 
 Extract the following information and return as JSON:
 {{
@@ -240,44 +538,345 @@ Extract the following information and return as JSON:
 
 Be thorough but concise. Extract all relevant skills and requirements. Return ONLY the JSON object."""
 
-    response_text = call_claude(prompt, max_tokens=3000)
-    parsed_data = parse_json_response(response_text)
 
-    return AnalyzeJobResponse(**parsed_data)
+ANALYZE_FIELD_DESCRIPTIONS = {
+    "title": '"Job title"',
+    "company": '"Company name"',
+    "requirements": '["List of key requirements"]',
+    "skills": '["List of technical and soft skills required"]',
+    "experience": '"Years of experience required (e.g., \'5+ years\') or null"',
+    "salary": '"Salary range if mentioned or null"',
+    "location": '"Job location or null"',
+    "disqualifiers": '["List of hard requirements that could disqualify candidates, e.g., \'US Citizenship Required\', \'TS/SCI Clearance\', \'PhD Required\']'
+}
 
 
-@app.post("/generate-resume", response_model=GenerateResumeResponse)
-def generate_resume(request: GenerateResumeRequest):
+def build_partial_analyze_prompt(job_url: str, job_text: str, fields: List[str]) -> str:
+    """
+    Build a prompt that asks Claude for only the given analysis fields
+    """
+    schema = ",\n".join(f'  "{field}": {ANALYZE_FIELD_DESCRIPTIONS[field]}' for field in fields)
+    return f"""Analyze this job posting and extract ONLY the fields listed below. Return ONLY valid JSON with no additional text.
+
+Job URL: {job_url}
+
+Job Text:
+{job_text}
+
+Extract the following information and return as JSON:
+{{
+{schema}
+}}
+
+Be thorough but concise. Return ONLY the JSON object."""
+
+
+# Forced tool calls: Claude's output arrives as schema-shaped tool input, not free text
+ANALYZE_TOOL = schema_tool(
+    "record_job_analysis", "Record the structured information extracted from the job posting", AnalyzeJobResponse
+)
+ANSWER_TOOL = schema_tool(
+    "record_answer", "Record the answer to the application question and how confident you are in it",
+    AnswerQuestionResponse
+)
+ANSWERS_TOOL = schema_tool(
+    "record_answers", "Record the answers to all of the application questions, one per fieldId",
+    QuestionAnswers
+)
+
+
+def compact_for_prompt(job_text: str) -> CompactionResult:
+    """
+    Compact scraped job text to the analyze token budget and record the savings
+    """
+    compacted = compact_job_text(job_text, ANALYZE_TOKEN_BUDGET)
+    record_compaction(compacted.original_tokens, compacted.compacted_tokens)
+    return compacted
+
+
+async def run_job_analysis(
+    job_url: str,
+    job_text: str,
+    mode: str = "llm",
+    lane: str = LANE_INTERACTIVE
+) -> Tuple[AnalyzeJobResponse, int]:
+    """
+    Analyze one posting, serving repeat postings from the analysis cache.
+
+    In "fast" mode the local heuristics answer alone; in "hybrid" mode Claude
+    is asked only for the fields the heuristics couldn't fill confidently.
+    Claude only ever sees the compacted job text. `lane` is the LLM scheduler
+    priority for the Claude call ("bulk" for /analyze-jobs).
+
+    Returns:
+        Tuple of (analysis, prompt tokens saved by compaction)
+    """
+    if mode == "fast":
+        fields, _ = extract_job_fields(job_text, job_url)
+        return AnalyzeJobResponse(**fields), 0
+
+    version = ANALYZE_PROMPT_VERSION if mode == "llm" else f"{ANALYZE_PROMPT_VERSION}:{mode}"
+    cache_key = make_cache_key(job_text, version)
+    cached = await run_in_threadpool(analysis_cache.get, cache_key)
+    if cached is not None:
+        return AnalyzeJobResponse(**cached), 0
+
+    try:
+        result, tokens_saved = await _analyze_with_claude(job_url, job_text, mode, lane)
+    except ClaudeUnavailableError:
+        return await _degraded_analysis(job_url, job_text, version), 0
+
+    await run_in_threadpool(analysis_cache.set, cache_key, result.model_dump())
+
+    return result, tokens_saved
+
+
+async def _degraded_analysis(job_url: str, job_text: str, version: str) -> AnalyzeJobResponse:
+    """
+    Answer while Claude is unavailable: an analysis of the same posting cached
+    under another mode if there is one, else the local heuristics. Neither is
+    written to the cache, so the posting is analyzed properly once Claude is back.
+    """
+    for other in (ANALYZE_PROMPT_VERSION, f"{ANALYZE_PROMPT_VERSION}:hybrid"):
+        if other == version:
+            continue
+        cached = await run_in_threadpool(analysis_cache.get, make_cache_key(job_text, other))
+        if cached is not None:
+            CLAUDE_FALLBACKS.inc(call_site="analyze_job", source="cache")
+            return AnalyzeJobResponse(**cached)
+
+    CLAUDE_FALLBACKS.inc(call_site="analyze_job", source="heuristic")
+    fields, _ = extract_job_fields(job_text, job_url)
+    return AnalyzeJobResponse(**fields)
+
+
+async def _analyze_with_claude(job_url: str, job_text: str, mode: str, lane: str) -> Tuple[AnalyzeJobResponse, int]:
+    """The hybrid / llm analysis paths of run_job_analysis"""
+    tokens_saved = 0
+    if mode == "hybrid":
+        fields, confidence = extract_job_fields(job_text, job_url)
+        missing = low_confidence_fields(confidence, HYBRID_CONFIDENCE_THRESHOLD)
+        if missing:
+            compacted = compact_for_prompt(job_text)
+            tokens_saved = compacted.tokens_saved
+
+            def validate(output: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+                parsed = parse_json_response(output, call_site="analyze_job")
+                # Fill the gaps, then check the merged result against the schema
+                merged = {**fields, **{field: parsed.get(field, fields[field]) for field in missing}}
+                AnalyzeJobResponse(**merged)
+                return merged
+
+            fields = await analyze_routed(
+                build_partial_analyze_prompt(job_url, compacted.text, missing),
+                schema_tool(ANALYZE_TOOL["name"], ANALYZE_TOOL["description"], AnalyzeJobResponse, missing),
+                validate,
+                lane
+            )
+        result = AnalyzeJobResponse(**fields)
+    else:
+        compacted = compact_for_prompt(job_text)
+        tokens_saved = compacted.tokens_saved
+        result = await analyze_routed(
+            build_analyze_prompt(job_url, compacted.text),
+            ANALYZE_TOOL,
+            lambda output: AnalyzeJobResponse(**parse_json_response(output, call_site="analyze_job")),
+            lane
+        )
+
+    return result, tokens_saved
+
+
+async def analyze_routed(prompt: str, tool: Dict[str, Any], validate: Callable[[Any], Any], lane: str) -> Any:
+    """
+    Run an analysis prompt on the model the router picks for its size,
+    escalating to the strong model if the output doesn't validate
+    """
+    return await call_with_escalation(
+        lambda model: call_claude(
+            prompt, max_tokens=3000, call_site="analyze_job", lane=lane, model=model, tool=tool
+        ),
+        validate,
+        "analyze_job",
+        choose_model("analyze_job", estimate_request_tokens(prompt))
+    )
+
+
+@router.post("/analyze-job", response_model=AnalyzeJobResponse)
+async def analyze_job(request: AnalyzeJobRequest, response: Response):
+    """
+    Analyze a job posting and extract structured requirements using Claude.
+    Repeat postings are served from the analysis cache.
+    """
+    result, tokens_saved = await run_job_analysis(request.jobUrl, request.jobText, request.mode)
+    response.headers["X-Prompt-Tokens-Saved"] = str(tokens_saved)
+    return result
+
+
+@router.post("/analyze-jobs")
+async def analyze_jobs(request: AnalyzeJobsRequest):
+    """
+    Analyze a batch of job postings with bounded concurrency. Claude calls go
+    in the scheduler's bulk lane, behind interactive and resume work.
+
+    Streams one NDJSON line per posting as soon as it finishes (in completion
+    order, tagged with its index in the request). A failed posting produces an
+    error line instead of failing the batch.
+    """
+    concurrency = request.concurrency or ANALYZE_BATCH_CONCURRENCY
+    concurrency = max(1, min(concurrency, ANALYZE_BATCH_MAX_CONCURRENCY))
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def analyze_one(index: int, job: AnalyzeJobRequest) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    result, tokens_saved = await run_job_analysis(job.jobUrl, job.jobText, job.mode, LANE_BULK)
+                    return {"index": index, "jobUrl": job.jobUrl, "ok": True,
+                            "result": result.model_dump(), "tokensSaved": tokens_saved}
+                except HTTPException as e:
+                    return {"index": index, "jobUrl": job.jobUrl, "ok": False,
+                            "status": e.status_code, "error": str(e.detail)}
+                except Exception as e:
+                    return {"index": index, "jobUrl": job.jobUrl, "ok": False,
+                            "status": 500, "error": str(e)}
+
+        tasks = [asyncio.create_task(analyze_one(i, job)) for i, job in enumerate(request.jobs)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Client went away mid-stream - stop queued work instead of finishing it
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """
+    Hit/miss counters for the /analyze-job result cache and the screening
+    answer store, how many concurrent Claude calls were coalesced into a
+    shared upstream request, the state of the Claude circuit breaker and the
+    LLM scheduler queues
+    """
+    try:
+        stats = analysis_cache.stats()
+        stats["singleFlight"] = {
+            claude_flight.name: claude_flight.stats(),
+            resume_flight.name: resume_flight.stats()
+        }
+        stats["circuitBreaker"] = claude_breaker.stats()
+        stats["scheduler"] = llm_scheduler.stats()
+        stats["answerStore"] = answer_store.stats()
+        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+def _cache_metrics() -> List[str]:
+    """Analysis cache, answer store and single-flight counters for /metrics"""
+    lines = [
+        "# HELP applyfast_analysis_cache_lookups_total Analysis cache lookups by result",
+        "# TYPE applyfast_analysis_cache_lookups_total counter",
+        f'applyfast_analysis_cache_lookups_total{{result="memory_hit"}} {analysis_cache.memory_hits}',
+        f'applyfast_analysis_cache_lookups_total{{result="db_hit"}} {analysis_cache.db_hits}',
+        f'applyfast_analysis_cache_lookups_total{{result="miss"}} {analysis_cache.misses}',
+        "# HELP applyfast_answer_store_lookups_total Screening-question answer store lookups by result",
+        "# TYPE applyfast_answer_store_lookups_total counter",
+        f'applyfast_answer_store_lookups_total{{result="exact_hit"}} {answer_store.exact_hits}',
+        f'applyfast_answer_store_lookups_total{{result="similar_hit"}} {answer_store.similar_hits}',
+        f'applyfast_answer_store_lookups_total{{result="override_hit"}} {answer_store.override_hits}',
+        f'applyfast_answer_store_lookups_total{{result="miss"}} {answer_store.misses}',
+        "# HELP applyfast_answer_store_evictions_total Learned answers expired or trimmed from the answer store",
+        "# TYPE applyfast_answer_store_evictions_total counter",
+        f'applyfast_answer_store_evictions_total {answer_store.evictions}',
+        "# HELP applyfast_singleflight_calls_total Upstream calls made vs. requests coalesced onto them",
+        "# TYPE applyfast_singleflight_calls_total counter"
+    ]
+    for flight in (claude_flight, resume_flight):
+        lines.append(f'applyfast_singleflight_calls_total{{call_site="{flight.name}",result="upstream"}} {flight.calls}')
+        lines.append(f'applyfast_singleflight_calls_total{{call_site="{flight.name}",result="coalesced"}} {flight.coalesced}')
+    return lines
+
+
+register_collector(_cache_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus text-format metrics: HTTP and Claude latency histograms,
+    in-flight gauges, token counters, JSON-parse failures and SQLite timings
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/usage")
+def get_usage():
+    """
+    Claude token usage per call site, including prompt-cache reads and writes,
+    the job-text tokens removed by compaction before analysis, and latency,
+    cost and escalations per call site and model
+    """
+    return {**usage_snapshot(), "compaction": compaction_snapshot(), "routes": route_snapshot()}
+
+
+@router.post("/generate-resume", response_model=GenerateResumeResponse)
+async def generate_resume(request: GenerateResumeRequest):
     """
     Generate a tailored resume based on job requirements and user profile using Claude
     """
     try:
         # Use the dedicated resume generator with William's real profile
-        result = generate_resume_with_analysis(
+        result = await generate_resume_with_analysis_async(
             job_requirements=request.jobRequirements,
             user_profile=request.userProfile if request.userProfile else None
         )
 
         return GenerateResumeResponse(**result)
 
+    except ClaudeUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume generation error: {str(e)}")
 
 
-@app.post("/answer-question", response_model=AnswerQuestionResponse)
-def answer_question(request: AnswerQuestionRequest):
-    """
-    Generate an answer to an application question using Claude
+@router.post("/generate-resume/stream")
+async def generate_resume_stream(request: GenerateResumeRequest):
     """
-    prompt = f"""You are helping a job applicant answer an application question honestly and effectively.
+    Stream a tailored resume over Server-Sent Events.
 
-Question: {request.question}
+    Emits "chunk" events ({"text": ...}) as Claude writes the resume, then a
+    final "analysis" event carrying the GenerateResumeResponse fields. Failures
+    after the stream has started arrive as an "error" event.
+    """
+    def sse(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    async def event_stream():
+        try:
+            async for event, payload in stream_resume_with_analysis(
+                job_requirements=request.jobRequirements,
+                user_profile=request.userProfile if request.userProfile else None
+            ):
+                if event == "chunk":
+                    yield sse("chunk", {"text": payload})
+                else:
+                    yield sse(event, GenerateResumeResponse(**payload).model_dump())
+        except Exception as e:
+            yield sse("error", {"detail": f"Resume generation error: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-User Profile:
-{json.dumps(request.userProfile, indent=2)}
 
-Job Context:
-{json.dumps(request.jobContext, indent=2)}
+ANSWER_SYSTEM_RULES = """You are helping a job applicant answer application questions honestly and effectively.
 
 Instructions:
 1. Generate a thoughtful, honest answer based on the user's profile
@@ -285,107 +884,625 @@ Instructions:
 3. Determine confidence level:
    - "auto": High confidence, can be submitted automatically
    - "review": Medium confidence, user should review before submitting
-   - "manual": Low confidence or sensitive question, user must write manually
+   - "manual": Low confidence or sensitive question, user must write manually"""
+
+
+def build_answer_prompt(
+    user_profile: Dict[str, Any],
+    job_context: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Build the cacheable prefix of an answer-question prompt.
+
+    The system blocks (rules + profile) are identical for every question the
+    same user asks; the job context block is identical for every question on
+    one application. Both end in a cache_control breakpoint so only the
+    question itself is processed fresh - once the prefix reaches the model's
+    minimum cacheable length. A typical profile doesn't (about 700 tokens with
+    the tool schema, against 1024 for Sonnet), so call_claude drops the
+    breakpoints until a profile grows past it.
+
+    Returns:
+        Tuple of (system blocks, leading user content blocks) - append the
+        question block to the latter
+    """
+    system_blocks = [
+        {
+            "type": "text",
+            "text": f"{ANSWER_SYSTEM_RULES}\n\nUser Profile:\n{json.dumps(user_profile, indent=2, sort_keys=True)}",
+            "cache_control": {"type": "ephemeral"}
+        }
+    ]
+    context_blocks = [
+        {
+            "type": "text",
+            "text": f"Job Context:\n{json.dumps(job_context, indent=2, sort_keys=True)}",
+            "cache_control": {"type": "ephemeral"}
+        }
+    ]
+    return system_blocks, context_blocks
+
+
+@router.post("/answer-question", response_model=AnswerQuestionResponse)
+async def answer_question(request: AnswerQuestionRequest):
+    """
+    Generate an answer to an application question using Claude, or reuse the
+    answer to a near-identical question from the answer store
+    """
+    give_up_at = time.monotonic() + CALL_SITE_DEADLINES["answer_question"]
+    stored = (await run_in_threadpool(
+        answer_store.lookup, [request.question], request.userProfile, request.jobContext
+    ))[0]
+    if stored is not None:
+        return AnswerQuestionResponse(**stored)
+
+    system_blocks, content_blocks = build_answer_prompt(request.userProfile, request.jobContext)
+    content_blocks.append({
+        "type": "text",
+        "text": f"""Question: {request.question}
 
 Return ONLY valid JSON with no additional text:
 {{
   "answer": "Your thoughtful answer here",
   "confidence": "auto"
 }}"""
+    })
+
+    # Simple factual questions go to the fast model; an unusable or "manual"
+    # answer from it is retried on the strong model
+    routed_model = choose_model(
+        "answer_question", estimate_request_tokens(content_blocks, system_blocks), questions=[request.question]
+    )
+    try:
+        answer = await call_with_escalation(
+            lambda model: call_claude(
+                content_blocks,
+                max_tokens=2000,
+                system=system_blocks,
+                call_site="answer_question",
+                deadline=give_up_at - time.monotonic(),
+                model=model,
+                tool=ANSWER_TOOL
+            ),
+            lambda output: AnswerQuestionResponse(**parse_json_response(output, call_site="answer_question")),
+            "answer_question",
+            routed_model,
+            confident=lambda answer: answer.confidence != "manual",
+            can_escalate=lambda: give_up_at - time.monotonic() >= ANSWER_RETRY_MIN_SECONDS
+        )
+    except ClaudeUnavailableError:
+        # Leave the field for the applicant rather than failing the whole form
+        CLAUDE_FALLBACKS.inc(call_site="answer_question", source="manual")
+        return AnswerQuestionResponse(answer="", confidence="manual")
+
+    await run_in_threadpool(
+        answer_store.remember,
+        [(request.question, answer.answer, answer.confidence)],
+        request.userProfile,
+        request.jobContext
+    )
+    return answer
+
+
+async def ask_questions(
+    system_blocks: List[Dict[str, Any]],
+    context_blocks: List[Dict[str, Any]],
+    questions: List[ScreeningQuestion],
+    model: str,
+    give_up_at: float
+) -> Tuple[Dict[str, AnswerQuestionResponse], str]:
+    """
+    Answer several questions from one form in a single Claude call.
+
+    Output missing a question, or not matching the schema, is retried on the
+    strong model (see model_router.call_with_escalation) if there is time.
+    `give_up_at` (time.monotonic()) is the request's deadline; every call
+    gets only what is left of it.
+
+    Returns:
+        Tuple of (answers keyed by fieldId, model that produced them)
+    """
+    listing = json.dumps([question.model_dump() for question in questions], indent=2)
+    content_blocks = context_blocks + [{
+        "type": "text",
+        "text": f"""Questions (all from the same application form):
+{listing}
+
+Answer every question, and record the answers with the record_answers tool: one entry per fieldId, each with its own confidence level."""
+    }]
+    field_ids = [question.fieldId for question in questions]
+    models_used: List[str] = []
+
+    async def call(model: str) -> Union[str, Dict[str, Any]]:
+        models_used.append(model)
+        return await call_claude(
+            content_blocks,
+            max_tokens=min(8000, 500 + ANSWER_TOKENS_PER_QUESTION * len(questions)),
+            system=system_blocks,
+            call_site="answer_questions",
+            deadline=give_up_at - time.monotonic(),
+            model=model,
+            tool=ANSWERS_TOOL
+        )
+
+    def validate(output: Union[str, Dict[str, Any]]) -> Dict[str, AnswerQuestionResponse]:
+        parsed = QuestionAnswers(**parse_json_response(output, call_site="answer_questions"))
+        answers = {
+            item.fieldId: AnswerQuestionResponse(answer=item.answer, confidence=item.confidence)
+            for item in parsed.answers
+        }
+        missing = [field_id for field_id in field_ids if field_id not in answers]
+        if missing:
+            raise ValueError(f"No answer for fields: {missing}")
+        return {field_id: answers[field_id] for field_id in field_ids}
+
+    answers = await call_with_escalation(
+        call, validate, "answer_questions", model,
+        can_escalate=lambda: give_up_at - time.monotonic() >= ANSWER_RETRY_MIN_SECONDS
+    )
+    return answers, models_used[-1]
+
+
+@router.post("/answer-questions", response_model=AnswerQuestionsResponse)
+async def answer_questions(request: AnswerQuestionsRequest):
+    """
+    Answer every screening question on a form page in one Claude call.
+
+    Questions the answer store already has an answer for are answered from
+    it; the rest are sent together, with the profile and job context once for
+    the whole page. Answers are keyed by fieldId, each with its own confidence.
+    If the fast model leaves some questions "manual", only those are asked
+    again on the strong model. All Claude calls share one request budget, so
+    the answers arrive before universal_apply.py gives up on the page.
+    """
+    if len(request.questions) > ANSWER_QUESTIONS_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {ANSWER_QUESTIONS_MAX} questions per request")
+    field_ids = [question.fieldId for question in request.questions]
+    if len(set(field_ids)) != len(field_ids):
+        raise HTTPException(status_code=400, detail="fieldId values must be unique")
+    if not request.questions:
+        return AnswerQuestionsResponse(answers={})
+
+    give_up_at = time.monotonic() + CALL_SITE_DEADLINES["answer_questions"]
+    stored = await run_in_threadpool(
+        answer_store.lookup,
+        [question.question for question in request.questions],
+        request.userProfile,
+        request.jobContext
+    )
+    answers: Dict[str, AnswerQuestionResponse] = {
+        question.fieldId: AnswerQuestionResponse(**reused)
+        for question, reused in zip(request.questions, stored)
+        if reused is not None
+    }
+    pending = [question for question in request.questions if question.fieldId not in answers]
+    if not pending:
+        return AnswerQuestionsResponse(answers=answers)
+
+    system_blocks, context_blocks = build_answer_prompt(request.userProfile, request.jobContext)
+    routed_model = choose_model(
+        "answer_questions",
+        estimate_request_tokens(context_blocks, system_blocks) + 50 * len(pending),
+        questions=[question.question for question in pending]
+    )
+
+    try:
+        generated, model_used = await ask_questions(
+            system_blocks, context_blocks, pending, routed_model, give_up_at
+        )
+        answers.update(generated)
+        unsure = [question for question in pending if answers[question.fieldId].confidence == "manual"]
+        if unsure and model_used != STRONG_MODEL and give_up_at - time.monotonic() >= ANSWER_RETRY_MIN_SECONDS:
+            record_escalation("answer_questions", "low_confidence")
+            retried, _ = await ask_questions(system_blocks, context_blocks, unsure, STRONG_MODEL, give_up_at)
+            answers.update(retried)
+    except ClaudeUnavailableError:
+        # Whatever wasn't answered is left for the applicant
+        CLAUDE_FALLBACKS.inc(call_site="answer_questions", source="manual")
+
+    await run_in_threadpool(
+        answer_store.remember,
+        [(question.question, answers[question.fieldId].answer, answers[question.fieldId].confidence)
+         for question in pending if question.fieldId in answers],
+        request.userProfile,
+        request.jobContext
+    )
+
+    manual = AnswerQuestionResponse(answer="", confidence="manual")
+    return AnswerQuestionsResponse(answers={field_id: answers.get(field_id, manual) for field_id in field_ids})
+
+
+@router.post("/answer-overrides", response_model=AnswerOverride)
+def set_answer_override(request: AnswerOverrideRequest):
+    """
+    Save your own answer to a screening question, for one company or (without
+    company) for all of them. It is used instead of asking Claude whenever a
+    similar question comes up.
+    """
+    if not request.question.strip() or not request.answer.strip():
+        raise HTTPException(status_code=400, detail="question and answer must not be empty")
+    try:
+        return answer_store.set_override(request.question, request.answer, request.company)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/answer-overrides", response_model=List[AnswerOverride])
+def get_answer_overrides():
+    """
+    List saved answer overrides
+    """
+    try:
+        return answer_store.list_overrides()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    response_text = call_claude(prompt, max_tokens=2000)
-    parsed_data = parse_json_response(response_text)
 
-    return AnswerQuestionResponse(**parsed_data)
+@router.delete("/answer-overrides/{override_id}")
+def delete_answer_override(override_id: int):
+    """
+    Delete a saved answer override by ID
+    """
+    try:
+        if not answer_store.delete_override(override_id):
+            raise HTTPException(status_code=404, detail="Override not found")
+        return {"success": True, "message": f"Override {override_id} deleted"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.post("/log-application", response_model=LogApplicationResponse)
+# Logging a job that's already recorded (same canonical URL) updates that row
+# instead of adding a duplicate: status and timestamp follow the latest log,
+# other fields keep their old value unless the new log provides one.
+APPLICATION_UPSERT_SQL = """
+    INSERT INTO applications
+    (job_url, company, title, status, resume_used, timestamp, metadata, canonical_url)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(canonical_url) DO UPDATE SET
+        status = excluded.status,
+        timestamp = excluded.timestamp,
+        company = COALESCE(excluded.company, company),
+        title = COALESCE(excluded.title, title),
+        resume_used = COALESCE(excluded.resume_used, resume_used),
+        metadata = COALESCE(excluded.metadata, metadata)
+"""
+
+# SQLite's default limit on bound parameters per statement is 32766; stay well below
+LOOKUP_CHUNK_SIZE = 500
+
+
+def application_row(request: LogApplicationRequest) -> Tuple:
+    """Parameters for APPLICATION_UPSERT_SQL from a log request"""
+    return (
+        request.jobUrl,
+        request.company,
+        request.title,
+        request.status,
+        request.resumeUsed,
+        request.timestamp or datetime.now().isoformat(),
+        json.dumps(request.metadata) if request.metadata else None,
+        canonicalize_job_url(request.jobUrl)
+    )
+
+
+def find_applications(conn: sqlite3.Connection, canonical_urls: List[str]) -> Dict[str, sqlite3.Row]:
+    """
+    Look up applications by canonical URL through the unique index.
+
+    Returns:
+        canonical URL -> row (id, status) for the URLs that have been logged
+    """
+    found = {}
+    unique = list(dict.fromkeys(url for url in canonical_urls if url))
+    for start in range(0, len(unique), LOOKUP_CHUNK_SIZE):
+        chunk = unique[start:start + LOOKUP_CHUNK_SIZE]
+        rows = conn.execute(
+            f"SELECT canonical_url, id, status FROM applications "
+            f"WHERE canonical_url IN ({','.join('?' * len(chunk))})",
+            chunk
+        ).fetchall()
+        found.update((row["canonical_url"], row) for row in rows)
+    return found
+
+
+@router.post("/log-application", response_model=LogApplicationResponse)
 def log_application(request: LogApplicationRequest):
     """
     Log a job application to the local SQLite database
+
+    Re-logging the same job (any URL variant of it) updates the existing
+    application rather than creating a duplicate.
     """
-    timestamp = request.timestamp or datetime.now().isoformat()
-    metadata_json = json.dumps(request.metadata) if request.metadata else None
+    row = application_row(request)
+    canonical_url = row[-1]
 
     try:
         with get_db() as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO applications
-                (job_url, company, title, status, resume_used, timestamp, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    request.jobUrl,
-                    request.company,
-                    request.title,
-                    request.status,
-                    request.resumeUsed,
-                    timestamp,
-                    metadata_json
-                )
-            )
+            conn.execute("BEGIN IMMEDIATE")
+            already_logged = bool(canonical_url) and canonical_url in find_applications(conn, [canonical_url])
+            application_id = conn.execute(APPLICATION_UPSERT_SQL + " RETURNING id", row).fetchone()["id"]
             conn.commit()
-            application_id = cursor.lastrowid
 
-        return LogApplicationResponse(success=True, applicationId=application_id)
+        return LogApplicationResponse(success=True, applicationId=application_id, alreadyLogged=already_logged)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.get("/applications", response_model=List[Application])
+@router.post("/log-applications", response_model=LogApplicationsResponse)
+def log_applications(request: LogApplicationsRequest):
+    """
+    Log many applications at once (history imports, offline queue flushes).
+
+    All rows are upserted with one executemany in a single transaction - one
+    commit instead of one per application - and either all are logged or none.
+    """
+    if len(request.applications) > LOG_APPLICATIONS_MAX_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {LOG_APPLICATIONS_MAX_BATCH} applications per request"
+        )
+    if not request.applications:
+        return LogApplicationsResponse(success=True, applicationIds=[], alreadyLogged=[])
+
+    rows = [application_row(application) for application in request.applications]
+    canonical_urls = [row[-1] for row in rows]
+
+    try:
+        with get_db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            existing = find_applications(conn, canonical_urls)
+            conn.executemany(APPLICATION_UPSERT_SQL, [row for row in rows if row[-1]])
+
+            # Rows without a URL can't be deduplicated or found again by URL
+            blank_ids = {
+                index: conn.execute(APPLICATION_UPSERT_SQL, row).lastrowid
+                for index, row in enumerate(rows) if not row[-1]
+            }
+            logged = find_applications(conn, canonical_urls)
+            conn.commit()
+
+        application_ids, already_logged, seen = [], [], set(existing)
+        for index, canonical_url in enumerate(canonical_urls):
+            if canonical_url:
+                application_ids.append(logged[canonical_url]["id"])
+                already_logged.append(canonical_url in seen)
+                seen.add(canonical_url)
+            else:
+                application_ids.append(blank_ids[index])
+                already_logged.append(False)
+
+        return LogApplicationsResponse(success=True, applicationIds=application_ids, alreadyLogged=already_logged)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.post("/applications/lookup", response_model=LookupApplicationsResponse)
+def lookup_applications(request: LookupApplicationsRequest):
+    """
+    Check whether jobs have already been applied to, before starting a browser run.
+
+    Each URL is canonicalized (tracking parameters, locale segments and URL
+    variants removed) and answered from the canonical_url unique index.
+    """
+    if len(request.jobUrls) > LOG_APPLICATIONS_MAX_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {LOG_APPLICATIONS_MAX_BATCH} URLs per request"
+        )
+
+    canonical_urls = [canonicalize_job_url(job_url) for job_url in request.jobUrls]
+
+    try:
+        with get_db() as conn:
+            found = find_applications(conn, canonical_urls)
+
+        results = []
+        for job_url, canonical_url in zip(request.jobUrls, canonical_urls):
+            row = found.get(canonical_url)
+            results.append(ApplicationLookup(
+                jobUrl=job_url,
+                canonicalUrl=canonical_url,
+                applied=row is not None,
+                applicationId=row["id"] if row else None,
+                status=row["status"] if row else None
+            ))
+        return LookupApplicationsResponse(results=results)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+def encode_cursor(created_at: str, application_id: int) -> str:
+    """Opaque pagination token for the last row of a page"""
+    raw = json.dumps([created_at, application_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of encode_cursor; rejects tokens that weren't produced by it"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, application_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(application_id, int):
+            raise ValueError
+        return created_at, application_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def application_filters(status: Optional[str], company: Optional[str], q: Optional[str]) -> Tuple[str, List[Any]]:
+    """
+    WHERE clauses (each starting with " AND") and parameters for the
+    /applications filters, using the trigram FTS index where it helps.
+    """
+    clauses = ""
+    params: List[Any] = []
+
+    if status:
+        clauses += " AND status = ?"
+        params.append(status)
+
+    if company:
+        if _use_fts(company):
+            clauses += f" AND id IN (SELECT rowid FROM {APPLICATIONS_FTS_TABLE} WHERE company LIKE ?)"
+        else:
+            clauses += " AND company LIKE ?"
+        params.append(f"%{company}%")
+
+    if q:
+        if _use_fts(q):
+            clauses += f" AND id IN (SELECT rowid FROM {APPLICATIONS_FTS_TABLE} WHERE {APPLICATIONS_FTS_TABLE} MATCH ?)"
+            params.append(_fts_phrase(q))
+        else:
+            clauses += " AND (company LIKE ? OR title LIKE ? OR job_url LIKE ?)"
+            params.extend([f"%{q}%"] * 3)
+
+    return clauses, params
+
+
+def _use_fts(term: str) -> bool:
+    """Trigram indexes only help for terms of 3+ characters"""
+    return applications_fts_enabled and len(term.strip()) >= 3
+
+
+def _fts_phrase(term: str) -> str:
+    """Quote a search term as an FTS5 phrase so operators in it are matched literally"""
+    return '"' + term.strip().replace('"', '""') + '"'
+
+
+@router.get("/applications", response_model=List[Application])
 def get_applications(
     limit: int = 100,
     status: Optional[str] = None,
-    company: Optional[str] = None
+    company: Optional[str] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
-    Get all logged applications with optional filtering
+    Get logged applications with optional filtering, newest first
+
+    company is a substring match on the company name; q is a substring search
+    across company, title and job URL. Both use the trigram FTS index when the
+    term has at least 3 characters.
+
+    Pages are keyset-paginated on (created_at, id): when more rows exist the
+    X-Next-Cursor header carries an opaque token to pass back as `cursor`.
+    Each page is an index seek, so deep pages cost the same as the first.
+
+    Rows are serialized straight to JSON (see fast_json.py): response_model
+    only documents the shape, and stored metadata JSON is embedded unparsed.
     """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    position = decode_cursor(cursor) if cursor else None
+
     try:
         with get_db() as conn:
-            query = "SELECT * FROM applications WHERE 1=1"
-            params = []
+            filters, params = application_filters(status, company, q)
+            query = f"SELECT {', '.join(APPLICATION_COLUMNS)} FROM applications WHERE 1=1{filters}"
+
+            if position:
+                # One arm per side of the page boundary, so each is an index seek
+                # (created_at = ? AND rowid < ?, then created_at < ?) merged in order.
+                # A row-value (created_at, id) < (?, ?) only seeks on created_at and
+                # then walks every row sharing it - a /log-applications import
+                # stamps thousands of rows with the same second.
+                created_at, application_id = position
+                query = f"{query} AND created_at = ? AND id < ? UNION ALL {query} AND created_at < ?"
+                params = params + [created_at, application_id] + params + [created_at]
+
+            # Fetch one extra row to learn whether another page exists
+            query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+            params.append(limit + 1)
+
+            rows = conn.execute(query, params).fetchall()
+
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Cursor"] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        # Returning a Response skips FastAPI's validate-and-reserialize pass;
+        # these rows come from our own table and already match Application
+        body = encode_array(encode_row(dict(row), raw_json_fields=("metadata",)) for row in rows)
+        return Response(content=body, media_type="application/json", headers=headers)
 
-            if status:
-                query += " AND status = ?"
-                params.append(status)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-            if company:
-                query += " AND company LIKE ?"
-                params.append(f"%{company}%")
 
-            query += " ORDER BY created_at DESC LIMIT ?"
-            params.append(limit)
+# Columns of the Application model, in its field order
+APPLICATION_COLUMNS = [
+    "id", "job_url", "company", "title", "status",
+    "resume_used", "timestamp", "metadata", "created_at"
+]
 
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-
-            applications = []
-            for row in rows:
-                metadata = json.loads(row["metadata"]) if row["metadata"] else None
-                applications.append(
-                    Application(
-                        id=row["id"],
-                        job_url=row["job_url"],
-                        company=row["company"],
-                        title=row["title"],
-                        status=row["status"],
-                        resume_used=row["resume_used"],
-                        timestamp=row["timestamp"],
-                        metadata=metadata,
-                        created_at=row["created_at"]
-                    )
-                )
-
-            return applications
+EXPORT_COLUMNS = [
+    "id", "job_url", "canonical_url", "company", "title", "status",
+    "resume_used", "timestamp", "metadata", "created_at"
+]
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@router.get("/applications/export")
+def export_applications(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status: Optional[str] = None,
+    company: Optional[str] = None,
+    q: Optional[str] = None
+):
+    """
+    Stream every matching application as NDJSON or CSV, newest first.
 
-@app.delete("/applications/{application_id}")
+    Rows go straight from a SQLite cursor to the response EXPORT_FETCH_SIZE at
+    a time, so memory stays flat however large the table is. The export reads
+    one consistent snapshot (WAL) while new applications keep being logged.
+    """
+    filters, params = application_filters(status, company, q)
+    query = (
+        f"SELECT {', '.join(EXPORT_COLUMNS)} FROM applications WHERE 1=1{filters} "
+        f"ORDER BY created_at DESC, id DESC"
+    )
+
+    def ndjson_lines(rows: List[sqlite3.Row]) -> bytes:
+        return b"".join(encode_row(dict(row), raw_json_fields=("metadata",)) + b"\n" for row in rows)
+
+    def csv_lines(rows: List[sqlite3.Row]) -> str:
+        # metadata stays a JSON string in its CSV cell
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(tuple(row) for row in rows)
+        return buffer.getvalue()
+
+    format_rows = ndjson_lines if export_format == "ndjson" else csv_lines
+
+    def stream_rows():
+        # Own connection for the whole download: each step of this generator can
+        # run on a different threadpool thread, so per-thread pooled ones won't do
+        conn = db_pool.connect(check_same_thread=False)
+        try:
+            cursor = conn.execute(query, params)
+            if export_format == "csv":
+                yield ",".join(EXPORT_COLUMNS) + "\r\n"
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    break
+                yield format_rows(rows)
+        finally:
+            conn.close()
+
+    media_type = "application/x-ndjson" if export_format == "ndjson" else "text/csv; charset=utf-8"
+    return StreamingResponse(
+        stream_rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="applications.{export_format}"'}
+    )
+
+
+@router.delete("/applications/{application_id}")
 def delete_application(application_id: int):
     """
     Delete a logged application by ID
@@ -409,32 +1526,31 @@ def delete_application(application_id: int):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.get("/applications/stats")
+@router.get("/applications/stats")
 def get_application_stats():
     """
     Get statistics about logged applications
+
+    Reads the rollup tables that triggers keep current on every write (see
+    migrations.py), so the cost doesn't grow with the number of applications.
     """
     try:
         with get_db() as conn:
             # Total applications
-            total = conn.execute("SELECT COUNT(*) as count FROM applications").fetchone()["count"]
+            total = conn.execute("SELECT count FROM application_totals WHERE id = 1").fetchone()["count"]
 
-            # By status
+            # By status ('' is how the rollup stores a NULL status)
             by_status = {}
-            status_rows = conn.execute(
-                "SELECT status, COUNT(*) as count FROM applications GROUP BY status"
-            ).fetchall()
+            status_rows = conn.execute("SELECT status, count FROM application_status_counts").fetchall()
             for row in status_rows:
-                by_status[row["status"]] = row["count"]
+                by_status[row["status"] or None] = row["count"]
 
             # By company (top 10)
             by_company = {}
             company_rows = conn.execute(
                 """
-                SELECT company, COUNT(*) as count
-                FROM applications
-                WHERE company IS NOT NULL
-                GROUP BY company
+                SELECT company, count
+                FROM application_company_counts
                 ORDER BY count DESC
                 LIMIT 10
                 """
@@ -446,15 +1562,14 @@ def get_application_stats():
             per_day = {}
             day_rows = conn.execute(
                 """
-                SELECT DATE(created_at) as date, COUNT(*) as count
-                FROM applications
-                WHERE created_at >= datetime('now', '-30 days')
-                GROUP BY DATE(created_at)
-                ORDER BY date DESC
+                SELECT day, count
+                FROM application_day_counts
+                WHERE day >= DATE('now', '-30 days')
+                ORDER BY day DESC
                 """
             ).fetchall()
             for row in day_rows:
-                per_day[row["date"]] = row["count"]
+                per_day[row["day"]] = row["count"]
 
             return {
                 "total": total,
@@ -467,6 +1582,60 @@ def get_application_stats():
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+# ══════════════════════════════════════════════════════════════════
+#  APP FACTORY
+# ══════════════════════════════════════════════════════════════════
+
+async def claude_unavailable_handler(request: Request, exc: ClaudeUnavailableError):
+    """503 with Retry-After, so clients back off instead of retrying into a degraded API"""
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else {}
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: migrate the database. Shutdown: close the Claude and SQLite connections."""
+    init_database()
+    try:
+        get_api_key()
+    except ValueError:
+        print("⚠️  ANTHROPIC_API_KEY not set - Claude-backed endpoints will fail until it is")
+    yield
+    await aclose_clients()
+    db_pool.close_all()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the ASGI app. Nothing here touches the network or the database;
+    that happens in lifespan() when the server starts.
+    """
+    # orjson-backed JSON responses (falls back to json when orjson isn't installed)
+    app = FastAPI(
+        title="ApplyFast API",
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan
+    )
+
+    # Add CORS middleware to allow Chrome extension to call API
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, restrict to your extension ID
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Prompt-Tokens-Saved"],
+    )
+    app.add_exception_handler(ClaudeUnavailableError, claude_unavailable_handler)
+    app.middleware("http")(record_http_metrics)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
+
 # ══════════════════════════════════════════════════════════════════
 #  MAIN ENTRY POINT
 # ══════════════════════════════════════════════════════════════════
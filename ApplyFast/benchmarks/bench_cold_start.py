@@ -0,0 +1,78 @@
+"""
+Benchmark: API cold start - time to `import apply_fast_api` in a fresh
+interpreter, and time from launching uvicorn to the first successful
+GET / response.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 5] [--app-dir PATH]
+
+--app-dir points at another checkout of ApplyFast to compare against.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(app_dir: str, workdir: str, env: dict) -> float:
+    code = (
+        "import sys, time; sys.path.insert(0, sys.argv[1]); "
+        "start = time.perf_counter(); import apply_fast_api; "
+        "print(time.perf_counter() - start)"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code, app_dir], cwd=workdir, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_server(app_dir: str, workdir: str, env: dict, port: int, timeout: float = 30) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "apply_fast_api:app", "--app-dir", app_dir,
+         "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not become ready")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ApplyFast API cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=APP_DIR)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    # Older versions refuse to import without a key; no request reaches Claude
+    env = {**os.environ, "ANTHROPIC_API_KEY": os.getenv("ANTHROPIC_API_KEY", "bench-placeholder")}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = [measure_import(args.app_dir, workdir, env) for _ in range(args.runs)]
+        servers = [measure_server(args.app_dir, workdir, env, args.port) for _ in range(args.runs)]
+
+    print(f"{os.path.abspath(args.app_dir)} ({args.runs} runs, median)")
+    print(f"  import apply_fast_api:       {statistics.median(imports) * 1000:7.0f} ms")
+    print(f"  uvicorn launch -> first 200: {statistics.median(servers) * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
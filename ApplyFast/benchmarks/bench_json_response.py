@@ -0,0 +1,133 @@
+"""
+Benchmark: GET /applications serialization on 10k rows - the original path
+(json.loads of metadata, Application models, response_model validation and
+re-serialization through JSONResponse) vs. the fast path in fast_json.py
+(rows encoded directly with orjson, metadata JSON passed through unparsed).
+
+Usage:
+    python benchmarks/bench_json_response.py [--rows 10000] [--iterations 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Response  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from fast_json import ORJSON_AVAILABLE, encode_array, encode_row  # noqa: E402
+
+COLUMNS = "id, job_url, company, title, status, resume_used, timestamp, metadata, created_at"
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+
+
+class Application(BaseModel):
+    id: int
+    job_url: str
+    company: Optional[str]
+    title: Optional[str]
+    status: str
+    resume_used: Optional[str]
+    timestamp: str
+    metadata: Optional[Dict[str, Any]]
+    created_at: str
+
+
+def seed(db_file: str, rows: int) -> None:
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+        CREATE TABLE applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, job_url TEXT NOT NULL, company TEXT, title TEXT,
+            status TEXT, resume_used TEXT, timestamp TEXT NOT NULL, metadata TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO applications (job_url, company, title, status, resume_used, timestamp, metadata) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                f"https://example.com/job/{i}", random.choice(COMPANIES), "Senior Software Engineer",
+                "applied", "tailored_resume_v1.pdf", "2025-01-01T10:30:00",
+                json.dumps({"matchScore": random.randint(40, 99), "platform": "linkedin",
+                            "appliedVia": "chrome_extension", "skills": ["Python", "SQL", "AWS"]})
+            )
+            for i in range(rows)
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+def build_app(db_file: str) -> FastAPI:
+    app = FastAPI()
+
+    def fetch(limit: int) -> List[sqlite3.Row]:
+        conn = sqlite3.connect(db_file)
+        conn.row_factory = sqlite3.Row
+        try:
+            return conn.execute(
+                f"SELECT {COLUMNS} FROM applications ORDER BY created_at DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    @app.get("/before", response_model=List[Application])
+    def before(limit: int = 10000):
+        """The original get_applications serialization."""
+        applications = []
+        for row in fetch(limit):
+            metadata = json.loads(row["metadata"]) if row["metadata"] else None
+            applications.append(Application(**{**dict(row), "metadata": metadata}))
+        return applications
+
+    @app.get("/after", response_model=List[Application])
+    def after(limit: int = 10000):
+        """The fast path now used by get_applications."""
+        body = encode_array(encode_row(dict(row), raw_json_fields=("metadata",)) for row in fetch(limit))
+        return Response(content=body, media_type="application/json")
+
+    return app
+
+
+def run(client: TestClient, path: str, rows: int, iterations: int) -> float:
+    client.get(path, params={"limit": rows})  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        response = client.get(path, params={"limit": rows})
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        seed(db_file, args.rows)
+        client = TestClient(build_app(db_file))
+
+        assert client.get("/before", params={"limit": 50}).json() == client.get("/after", params={"limit": 50}).json()
+
+        print(f"{args.rows} rows, {args.iterations} requests each (orjson: {'yes' if ORJSON_AVAILABLE else 'no'})")
+        before = run(client, "/before", args.rows, args.iterations)
+        print(f"  before (models + response_model): {before * 1000:8.1f} ms/request")
+        after = run(client, "/after", args.rows, args.iterations)
+        print(f"  after  (fast_json passthrough):   {after * 1000:8.1f} ms/request")
+        print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark: per-request sqlite3.connect (rollback journal) vs. the pooled
+WAL connections from db_pool.py, under concurrent /log-application-style
+writes and /applications-style reads.
+
+Usage:
+    python benchmarks/bench_sqlite_pool.py [--threads 16] [--seconds 5] [--write-ratio 0.2]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_pool import SQLitePool  # noqa: E402
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS applications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_url TEXT NOT NULL,
+        company TEXT,
+        title TEXT,
+        status TEXT,
+        resume_used TEXT,
+        timestamp TEXT NOT NULL,
+        metadata TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka"]
+
+
+def seed(db_file: str, rows: int) -> None:
+    conn = sqlite3.connect(db_file)
+    conn.execute(SCHEMA)
+    conn.executemany(
+        "INSERT INTO applications (job_url, company, title, status, timestamp) VALUES (?, ?, ?, ?, ?)",
+        [(f"https://example.com/job/{i}", random.choice(COMPANIES), "Engineer", "applied", "2025-01-01")
+         for i in range(rows)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def fresh_connection_factory(db_file: str):
+    """The original get_db(): new connection per request, default journal."""
+    @contextmanager
+    def get_db():
+        conn = sqlite3.connect(db_file, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+    return get_db, lambda: None
+
+
+def pooled_factory(db_file: str):
+    pool = SQLitePool(db_file)
+
+    @contextmanager
+    def get_db():
+        conn = pool.connection()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+    return get_db, pool.close_all
+
+
+def run(get_db, threads: int, seconds: float, write_ratio: float) -> dict:
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        reads = writes = errors = 0
+        while time.perf_counter() < deadline:
+            try:
+                with get_db() as conn:
+                    if random.random() < write_ratio:
+                        conn.execute(
+                            "INSERT INTO applications (job_url, company, title, status, timestamp) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            ("https://example.com/job/new", random.choice(COMPANIES), "Engineer",
+                             "applied", "2025-01-01")
+                        )
+                        conn.commit()
+                        writes += 1
+                    else:
+                        conn.execute(
+                            "SELECT * FROM applications WHERE company LIKE ? ORDER BY created_at DESC LIMIT 100",
+                            (f"%{random.choice(COMPANIES)}%",)
+                        ).fetchall()
+                        reads += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with lock:
+            counts["reads"] += reads
+            counts["writes"] += writes
+            counts["errors"] += errors
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for _ in range(threads):
+            executor.submit(worker)
+
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, factory in (("fresh connection", fresh_connection_factory), ("pooled WAL", pooled_factory)):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, "bench.db")
+            seed(db_file, args.rows)
+            get_db, close = factory(db_file)
+            results[name] = run(get_db, args.threads, args.seconds, args.write_ratio)
+            close()
+
+    print(f"{args.threads} threads, {args.seconds}s, {args.write_ratio:.0%} writes, {args.rows} seeded rows")
+    print(f"{'mode':<18}{'reads/s':>12}{'writes/s':>12}{'errors/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['reads']:>12.0f}{result['writes']:>12.0f}{result['errors']:>12.1f}")
+    base, pooled = results["fresh connection"], results["pooled WAL"]
+    print(f"speedup: reads x{pooled['reads'] / max(base['reads'], 1):.1f}, "
+          f"writes x{pooled['writes'] / max(base['writes'], 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
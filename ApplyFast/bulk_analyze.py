@@ -0,0 +1,239 @@
+"""
+Bulk Job Analysis - Overnight re-analysis through the Message Batches API
+
+Submits the /analyze-job prompt for many postings as Anthropic Message
+Batches (half the price of synchronous calls and a separate rate limit, so
+backfills don't compete with interactive traffic), then polls the batches
+and ingests finished analyses into the analysis_cache table that
+/analyze-job already reads from.
+
+Usage:
+    python bulk_analyze.py submit postings.jsonl   # queue batches, return immediately
+    python bulk_analyze.py poll                    # ingest any batches that have ended
+    python bulk_analyze.py run postings.jsonl      # submit, wait, ingest
+
+postings.jsonl holds one {"jobUrl": ..., "jobText": ...} object per line.
+Set ANTHROPIC_BASE_URL=http://localhost:8765 to run against fake_batch_server.py.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+import anthropic
+
+from analysis_cache import make_cache_key
+from apply_fast_api import (
+    ANALYZE_PROMPT_VERSION, ANALYZE_TOOL, CLAUDE_MODEL, AnalyzeJobResponse, analysis_cache,
+    build_analyze_prompt, compact_for_prompt, get_db, init_database, message_output, parse_json_response
+)
+
+# The Batches API accepts at most 100,000 requests per batch; smaller batches
+# finish (and can be ingested) sooner
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_POLL_INTERVAL = 60
+
+
+def read_postings(path: str) -> Iterator[Dict[str, str]]:
+    """Yield {"jobUrl", "jobText"} dicts from a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            posting = json.loads(line)
+            if not posting.get("jobText"):
+                print(f"  ⚠️  Line {line_number}: missing jobText, skipped")
+                continue
+            yield {"jobUrl": posting.get("jobUrl", ""), "jobText": posting["jobText"]}
+
+
+def submit_postings(client: anthropic.Anthropic, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    force: bool = False) -> List[str]:
+    """
+    Queue every posting that isn't already cached as Message Batch requests.
+
+    Returns:
+        IDs of the batches that were created
+    """
+    batch_ids = []
+    pending: Dict[str, Dict[str, Any]] = {}
+    skipped = 0
+
+    def flush():
+        if not pending:
+            return
+        batch = client.beta.messages.batches.create(
+            requests=[
+                {"custom_id": custom_id, "params": item["params"]}
+                for custom_id, item in pending.items()
+            ]
+        )
+        with get_db() as conn:
+            conn.execute(
+                """
+                INSERT INTO analysis_batches (batch_id, status, request_count, submitted_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (batch.id, batch.processing_status, len(pending), datetime.now().isoformat())
+            )
+            conn.executemany(
+                """
+                INSERT INTO analysis_batch_items (batch_id, custom_id, job_url, status)
+                VALUES (?, ?, ?, 'pending')
+                """,
+                [(batch.id, custom_id, item["jobUrl"]) for custom_id, item in pending.items()]
+            )
+            conn.commit()
+        print(f"  📤 Submitted batch {batch.id} ({len(pending)} postings)")
+        batch_ids.append(batch.id)
+        pending.clear()
+
+    for posting in read_postings(path):
+        # The cache key doubles as the custom_id (sha256 hex is exactly 64 chars)
+        cache_key = make_cache_key(posting["jobText"], ANALYZE_PROMPT_VERSION)
+        if cache_key in pending or (not force and analysis_cache.get(cache_key) is not None):
+            skipped += 1
+            continue
+
+        pending[cache_key] = {
+            "jobUrl": posting["jobUrl"],
+            "params": {
+                "model": CLAUDE_MODEL,
+                "max_tokens": 3000,
+                "tools": [ANALYZE_TOOL],
+                "tool_choice": {"type": "tool", "name": ANALYZE_TOOL["name"]},
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": build_analyze_prompt(posting["jobUrl"], compact_for_prompt(posting["jobText"]).text)
+                    }
+                ]
+            }
+        }
+        if len(pending) >= chunk_size:
+            flush()
+
+    flush()
+    print(f"  ℹ️  Skipped {skipped} postings already cached or duplicated")
+    return batch_ids
+
+
+def ingest_batch(client: anthropic.Anthropic, batch_id: str) -> Dict[str, int]:
+    """
+    Store the results of an ended batch in the analysis cache.
+
+    Returns:
+        Counts of succeeded and failed requests
+    """
+    counts = {"succeeded": 0, "failed": 0}
+    item_updates = []
+
+    for response in client.beta.messages.batches.results(batch_id):
+        status, error = "succeeded", None
+        if response.result.type == "succeeded":
+            try:
+                parsed = parse_json_response(message_output(response.result.message), call_site="bulk_analyze")
+                result = AnalyzeJobResponse(**parsed)
+                analysis_cache.set(response.custom_id, result.model_dump())
+            except Exception as e:
+                status, error = "invalid", str(getattr(e, "detail", e))[:500]
+        else:
+            status = response.result.type
+            if response.result.type == "errored":
+                error = response.result.error.error.message[:500]
+
+        counts["succeeded" if status == "succeeded" else "failed"] += 1
+        item_updates.append((status, error, batch_id, response.custom_id))
+
+    with get_db() as conn:
+        conn.executemany(
+            "UPDATE analysis_batch_items SET status = ?, error = ? WHERE batch_id = ? AND custom_id = ?",
+            item_updates
+        )
+        conn.execute(
+            "UPDATE analysis_batches SET status = 'ingested', ingested_at = ? WHERE batch_id = ?",
+            (datetime.now().isoformat(), batch_id)
+        )
+        conn.commit()
+
+    return counts
+
+
+def poll_batches(client: anthropic.Anthropic, wait: bool = False,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL) -> int:
+    """
+    Check every batch that hasn't been ingested yet and ingest the ended ones.
+
+    Args:
+        wait: Keep polling until no batches remain outstanding
+
+    Returns:
+        Number of batches still outstanding
+    """
+    while True:
+        with get_db() as conn:
+            rows = conn.execute(
+                "SELECT batch_id FROM analysis_batches WHERE status != 'ingested' ORDER BY submitted_at"
+            ).fetchall()
+
+        outstanding = 0
+        for row in rows:
+            batch = client.beta.messages.batches.retrieve(row["batch_id"])
+            if batch.processing_status != "ended":
+                outstanding += 1
+                with get_db() as conn:
+                    conn.execute(
+                        "UPDATE analysis_batches SET status = ? WHERE batch_id = ?",
+                        (batch.processing_status, batch.id)
+                    )
+                    conn.commit()
+                print(f"  ⏳ {batch.id}: {batch.processing_status} "
+                      f"({batch.request_counts.processing} processing)")
+                continue
+
+            counts = ingest_batch(client, batch.id)
+            print(f"  ✅ {batch.id}: ingested {counts['succeeded']} analyses, {counts['failed']} failed")
+
+        if not wait or outstanding == 0:
+            return outstanding
+        time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk job analysis via the Message Batches API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("submit", "run"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("postings", help="JSONL file of {jobUrl, jobText} objects")
+        sub.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        sub.add_argument("--force", action="store_true", help="Re-analyze postings that are already cached")
+        sub.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+
+    poll = subparsers.add_parser("poll")
+    poll.add_argument("--wait", action="store_true", help="Keep polling until every batch is ingested")
+    poll.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+
+    args = parser.parse_args()
+
+    # Importing the API doesn't touch the database; make sure the schema exists
+    init_database()
+
+    # Reads ANTHROPIC_API_KEY / ANTHROPIC_BASE_URL from the environment
+    client = anthropic.Anthropic()
+
+    if args.command in ("submit", "run"):
+        submit_postings(client, args.postings, chunk_size=args.chunk_size, force=args.force)
+
+    if args.command in ("poll", "run"):
+        outstanding = poll_batches(client, wait=args.command == "run" or args.wait,
+                                   poll_interval=args.poll_interval)
+        if outstanding:
+            print(f"  ℹ️  {outstanding} batches still processing - run 'poll' again later")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Fake Message Batches server - local stand-in for testing bulk_analyze.py
+
+Implements just enough of the Anthropic Message Batches API (create,
+retrieve, results) to exercise the bulk pipeline without an API key or
+spend. Batches report "in_progress" for FAKE_BATCH_DELAY seconds and then
+end with a canned analysis built from each posting's text.
+
+Usage:
+    python fake_batch_server.py
+    ANTHROPIC_BASE_URL=http://localhost:8765 ANTHROPIC_API_KEY=fake python bulk_analyze.py run postings.jsonl
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+FAKE_BATCH_DELAY = float(os.getenv("FAKE_BATCH_DELAY", 2))
+FAKE_BATCH_PORT = int(os.getenv("FAKE_BATCH_PORT", 8765))
+
+app = FastAPI(title="Fake Message Batches API")
+
+# batch_id -> {"created": epoch seconds, "requests": [...]}
+batches: Dict[str, Dict[str, Any]] = {}
+
+
+class BatchCreateRequest(BaseModel):
+    requests: List[Dict[str, Any]]
+
+
+def _fake_analysis(prompt: str) -> Dict[str, Any]:
+    """Build a plausible analysis from the job text embedded in the analyze prompt."""
+    match = re.search(r"Job Text:\n(.*?)\n\nExtract the following", prompt, re.DOTALL)
+    job_text = match.group(1) if match else prompt
+    lines = [line.strip() for line in job_text.splitlines() if line.strip()]
+    years = re.search(r"(\d+)\+?\s*years", job_text, re.IGNORECASE)
+    return {
+        "title": lines[0][:100] if lines else None,
+        "company": None,
+        "requirements": lines[1:4],
+        "skills": [],
+        "experience": f"{years.group(1)}+ years" if years else None,
+        "salary": None,
+        "location": None,
+        "disqualifiers": []
+    }
+
+
+def _batch_object(batch_id: str, request: Request) -> Dict[str, Any]:
+    """Render a batch in the Message Batches API response shape."""
+    batch = batches[batch_id]
+    created = datetime.fromtimestamp(batch["created"], tz=timezone.utc)
+    ended = time.time() - batch["created"] >= FAKE_BATCH_DELAY
+    count = len(batch["requests"])
+    return {
+        "id": batch_id,
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else count,
+            "succeeded": count if ended else 0,
+            "errored": 0,
+            "canceled": 0,
+            "expired": 0
+        },
+        "created_at": created.isoformat(),
+        "expires_at": (created + timedelta(hours=24)).isoformat(),
+        "ended_at": (created + timedelta(seconds=FAKE_BATCH_DELAY)).isoformat() if ended else None,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "results_url": str(request.url_for("batch_results", batch_id=batch_id)) if ended else None
+    }
+
+
+@app.post("/v1/messages/batches")
+def create_batch(body: BatchCreateRequest, request: Request):
+    batch_id = f"msgbatch_fake_{uuid.uuid4().hex[:16]}"
+    batches[batch_id] = {"created": time.time(), "requests": body.requests}
+    return _batch_object(batch_id, request)
+
+
+@app.get("/v1/messages/batches/{batch_id}")
+def retrieve_batch(batch_id: str, request: Request):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return _batch_object(batch_id, request)
+
+
+@app.get("/v1/messages/batches/{batch_id}/results", name="batch_results")
+def batch_results(batch_id: str):
+    if batch_id not in batches:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    lines = []
+    for item in batches[batch_id]["requests"]:
+        params = item["params"]
+        prompt = params["messages"][0]["content"]
+        analysis = _fake_analysis(prompt)
+        if params.get("tools"):
+            # Forced tool call, as bulk_analyze.py requests
+            content = [{"type": "tool_use", "id": f"toolu_fake_{uuid.uuid4().hex[:16]}",
+                        "name": params["tools"][0]["name"], "input": analysis}]
+            stop_reason = "tool_use"
+        else:
+            content = [{"type": "text", "text": json.dumps(analysis)}]
+            stop_reason = "end_turn"
+        lines.append(json.dumps({
+            "custom_id": item["custom_id"],
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "id": f"msg_fake_{uuid.uuid4().hex[:16]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": params["model"],
+                    "content": content,
+                    "stop_reason": stop_reason,
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": len(prompt) // 4, "output_tokens": 100}
+                }
+            }
+        }))
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="application/x-jsonl")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print(f"Fake Message Batches API on http://localhost:{FAKE_BATCH_PORT} "
+          f"(batches end after {FAKE_BATCH_DELAY}s)")
+    uvicorn.run(app, host="127.0.0.1", port=FAKE_BATCH_PORT, log_level="warning")
@@ -0,0 +1,66 @@
+"""
+Fast JSON - orjson-backed response serialization with a stdlib fallback
+
+orjson serializes several times faster than the stdlib json module and emits
+bytes directly. FastJSONResponse is the API's default response class;
+encode_row() serializes trusted SQLite rows without Pydantic and splices
+columns that already hold JSON (e.g. applications.metadata) into the output
+as-is instead of parsing and re-encoding them.
+
+orjson is optional: without it everything falls back to the json module.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        # NON_STR_KEYS matches json.dumps for dicts keyed by None / ints (e.g. stats byStatus)
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def encode_row(row: Dict[str, Any], raw_json_fields: Sequence[str] = ()) -> bytes:
+    """
+    Serialize one database row to a JSON object.
+
+    Args:
+        row: Column name -> value (e.g. dict(sqlite3.Row))
+        raw_json_fields: Columns whose values are already valid JSON text
+            (written by json.dumps) and are embedded without re-parsing;
+            NULL becomes null
+
+    Returns:
+        The JSON object as bytes
+    """
+    plain = {name: value for name, value in row.items() if name not in raw_json_fields}
+    parts = [dumps(plain)[:-1]]  # drop the closing brace; raw fields are appended
+    for index, name in enumerate(raw_json_fields):
+        raw: Optional[str] = row.get(name)
+        separator = b"," if plain or index else b""
+        parts.append(separator + dumps(name) + b":" + (raw.encode("utf-8") if raw else b"null"))
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def encode_array(items: Iterable[bytes]) -> bytes:
+    """Join already-encoded JSON values into a JSON array."""
+    return b"[" + b",".join(items) + b"]"
@@ -0,0 +1,144 @@
+"""
+Job Compaction - Shrink scraped job text before it goes into a prompt
+
+Scraped postings carry EEO statements, benefits blurbs, cookie banners and
+navigation text that repeats on every page. Compaction dedupes lines, drops
+known boilerplate sections and enforces a token budget while always keeping
+the header and the required-qualifications section.
+"""
+
+import math
+import re
+from typing import List, NamedTuple
+
+from job_extract import extract_required_section
+
+# Header lines (title / company / location) are always kept
+HEADER_LINES = 8
+
+# Headings that start a section we can drop entirely
+_BOILERPLATE_HEADING = re.compile(
+    r"^(?:equal\s+(?:employment\s+)?opportunity|eeo\b|eeo\s+statement|benefits|perks|what\s+we\s+offer|"
+    r"our\s+benefits|why\s+(?:join|work)|life\s+at\s|accommodations?|reasonable\s+accommodation|"
+    r"privacy|applicant\s+privacy|e-?verify|pay\s+transparency|disclaimer|"
+    r"similar\s+jobs|people\s+also\s+viewed|more\s+jobs|related\s+jobs)",
+    re.I
+)
+
+# Headings that start content we must keep (end a skipped boilerplate section)
+_CONTENT_HEADING = re.compile(
+    r"^(?:about\s+(?:the\s+)?(?:role|job|position|you)|responsibilities|what\s+you(?:'ll)?\s+(?:do|need|bring)|"
+    r"requirements|qualifications|required|minimum|basic|preferred|nice\s+to\s+have|must[ -]have|"
+    r"skills|experience|education|compensation|salary|location|job\s+(?:description|requirements|qualifications|"
+    r"responsibilities|summary|details)|the\s+role|your\s+role|who\s+you\s+are|overview|duties)",
+    re.I
+)
+
+# Single lines that are noise wherever they appear
+_NOISE_LINE = re.compile(
+    r"(?:cookie|cookies|accept\s+all|manage\s+preferences|skip\s+to\s+(?:main\s+)?content|"
+    r"^sign\s+in$|^log\s+in$|^join\s+now$|^apply(?:\s+now)?$|^easy\s+apply$|^save(?:\s+job)?$|^share$|"
+    r"^report\s+this\s+job$|^show\s+(?:more|less)$|^see\s+(?:more|less)$|^back\s+to\s+(?:search|jobs)|"
+    r"^\d+\s+(?:applicants?|clicked\s+apply)|^promoted$|^actively\s+recruiting$|"
+    r"without\s+regard\s+to\s+race|equal\s+opportunity\s+employer|protected\s+veteran|"
+    r"gender\s+identity|sexual\s+orientation)",
+    re.I
+)
+
+
+class CompactionResult(NamedTuple):
+    text: str
+    original_tokens: int
+    compacted_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return math.ceil(len(text) / 4)
+
+
+def _is_heading(line: str) -> bool:
+    """Short lines, or lines ending in a colon, read as section headings."""
+    return len(line) <= 60 and (line.endswith(":") or len(line.split()) <= 6)
+
+
+def _strip_boilerplate(lines: List[str]) -> List[str]:
+    """Dedupe lines, drop noise lines and skip boilerplate sections."""
+    kept = []
+    seen = set()
+    skipping = False
+
+    for line in lines:
+        normalized = re.sub(r"\s+", " ", line).strip().lower()
+        if not normalized:
+            continue
+
+        if _is_heading(line):
+            if _BOILERPLATE_HEADING.match(normalized):
+                skipping = True
+                continue
+            if _CONTENT_HEADING.match(normalized):
+                skipping = False
+
+        if skipping or normalized in seen or _NOISE_LINE.search(normalized):
+            continue
+
+        seen.add(normalized)
+        kept.append(line)
+
+    return kept
+
+
+def _fit_budget(lines: List[str], token_budget: int) -> List[str]:
+    """
+    Keep the header, then the required section, then everything else in
+    document order, until the token budget is used up.
+    """
+    required_section = extract_required_section("\n".join(lines)) or ""
+    required_lines = {line.strip() for line in required_section.splitlines() if line.strip()}
+
+    priority = []
+    for index, line in enumerate(lines):
+        if index < HEADER_LINES:
+            rank = 0
+        elif line in required_lines:
+            rank = 1
+        else:
+            rank = 2
+        priority.append((rank, index))
+
+    selected = set()
+    used = 0
+    for _, index in sorted(priority):
+        cost = estimate_tokens(lines[index]) + 1  # +1 for the newline
+        if used + cost > token_budget:
+            continue
+        selected.add(index)
+        used += cost
+
+    return [line for index, line in enumerate(lines) if index in selected]
+
+
+def compact_job_text(job_text: str, token_budget: int = 2000) -> CompactionResult:
+    """
+    Compact scraped job text for use in an analysis prompt.
+
+    Args:
+        job_text: Raw text scraped from the posting page
+        token_budget: Maximum estimated tokens to keep (0 disables the budget)
+
+    Returns:
+        CompactionResult with the compacted text and before/after token estimates
+    """
+    lines = [line.strip() for line in (job_text or "").splitlines()]
+    lines = _strip_boilerplate(lines)
+
+    if token_budget and estimate_tokens("\n".join(lines)) > token_budget:
+        lines = _fit_budget(lines, token_budget)
+
+    text = "\n".join(lines)
+    return CompactionResult(text, estimate_tokens(job_text or ""), estimate_tokens(text))
@@ -0,0 +1,308 @@
+"""
+Job Extract - Local deterministic extraction of job posting fields
+
+Python port of the NLP-style extractors in content.js (extractRequiredSection,
+extractYearsOfExperience, extractRemotePolicy, extractSalary, extractClearance,
+extractSkills), extended to fill the full AnalyzeJobResponse shape. Every field
+comes with a 0-1 confidence so callers can decide which fields still need Claude.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fields at or above this confidence are trusted without asking Claude
+DEFAULT_CONFIDENCE_THRESHOLD = 0.7
+
+_REQUIRED_SECTION_PATTERNS = [
+    re.compile(r"(?:required|minimum|must[ -]have|basic)\s*(?:skills|qualifications|requirements|experience)[:\s]*", re.I),
+    re.compile(r"what\s+you(?:'ll)?\s+need[:\s]*", re.I),
+    re.compile(r"qualifications[:\s]*", re.I),
+    re.compile(r"requirements[:\s]*", re.I),
+]
+_NEXT_SECTION = re.compile(
+    r"\n\s*(?:preferred|nice to have|bonus|benefits|about us|about the|what we offer|responsibilities|perks|additional|desired|compensation)",
+    re.I
+)
+
+_YEARS_PATTERNS = [
+    re.compile(r"(\d+)\+?\s*(?:to|-)\s*(\d+)\+?\s*years?\s+(?:of\s+)?(?:experience|exp)", re.I),
+    re.compile(r"(\d+)\+?\s*years?\s+(?:of\s+)?(?:experience|exp|professional|relevant|related|work)", re.I),
+    re.compile(r"(?:experience|exp)[:\s]*(\d+)\+?\s*years?", re.I),
+    re.compile(r"minimum\s+(?:of\s+)?(\d+)\+?\s*years?", re.I),
+    re.compile(r"at\s+least\s+(\d+)\+?\s*years?", re.I),
+]
+
+_SALARY_PATTERNS = [
+    re.compile(r"\$\s*([\d,]+\.?\d*)\s*[kK]?\s*(?:[-–—to]+)\s*\$\s*([\d,]+\.?\d*)\s*[kK]?\s*(?:per\s+(?:year|annum|yr)|/?(?:yr|year|annual))?"),
+    re.compile(r"\$\s*([\d,]+\.?\d*)\s*[kK]?\s*(?:per\s+(?:year|annum|yr)|/?(?:yr|year|annual))", re.I),
+    re.compile(r"\$\s*([\d,]+\.?\d*)\s*(?:[-–—to]+)\s*\$\s*([\d,]+\.?\d*)\s*(?:per\s+hour|/\s*hr|/\s*hour)", re.I),
+]
+
+_CLEARANCE_FLAGS = [
+    (re.compile(r"\bus\s+citizen|united\s+states\s+citizen|\bu\.s\.\s+citizen"), "US Citizenship Required"),
+    (re.compile(r"\bgreen\s*card\b"), "Green Card Acceptable"),
+    (re.compile(r"\bsecurity\s+clearance\b"), "Security Clearance Required"),
+    (re.compile(r"\btop\s+secret\b"), "Top Secret Clearance"),
+    (re.compile(r"\bts/sci\b"), "TS/SCI Clearance"),
+    (re.compile(r"\bpublic\s+trust\b"), "Public Trust Clearance"),
+    (re.compile(r"\bauthori[sz]ed\s+to\s+work\b"), "Work Authorization Required"),
+    (re.compile(r"\bexport\s+control\b|\bitar\b|\bear\b"), "Export Control / ITAR"),
+]
+
+_KNOWN_SKILLS = [
+    "javascript", "typescript", "python", "java", r"c\+\+", "c#", "go", "golang",
+    "rust", "ruby", "php", "swift", "kotlin", "scala", r"r\b",
+    "react", "angular", "vue", "svelte", r"next\.?js", "nuxt",
+    r"node\.?js", "express", "django", "flask", "fastapi", "spring",
+    "rails", "laravel", r"asp\.net",
+    "html", "css", "sass", "tailwind", "bootstrap",
+    "sql", "nosql", "postgresql", "postgres", "mysql", "mongodb", "redis",
+    "dynamodb", "cassandra", "elasticsearch",
+    "aws", "azure", "gcp", "google cloud",
+    "docker", "kubernetes", "k8s", "terraform", "ansible",
+    "ci/cd", "jenkins", "github actions", "gitlab",
+    "git", "linux", "unix", "bash",
+    "rest", "graphql", "grpc", "api",
+    "machine learning", "deep learning", "nlp", "computer vision",
+    "tensorflow", "pytorch", "scikit-learn",
+    "data analysis", "data engineering", "etl", "spark", "hadoop",
+    "tableau", "power bi", "excel",
+    "figma", "sketch", "adobe",
+    "agile", "scrum", "jira", "kanban",
+    "product management", "project management",
+    "communication", "leadership", "problem.solving",
+]
+
+
+def _skills_pattern(skills: List[str]) -> "re.Pattern[str]":
+    """
+    One regex matching any known skill; group s<i> names the _KNOWN_SKILLS entry.
+
+    Alternatives are grouped under a lookahead on their first letter, so at each
+    word only the few skills starting with that letter are tried - about 10x
+    faster than ~100 separate searches or one flat alternation.
+    """
+    by_first_letter: Dict[str, List[str]] = {}
+    for i, skill in enumerate(skills):
+        by_first_letter.setdefault(skill[0], []).append(f"(?P<s{i}>{skill})")
+    groups = "|".join(f"(?={letter})(?:{'|'.join(alts)})" for letter, alts in by_first_letter.items())
+    # JS \b treats '+' and '#' as non-word characters, so "c++"/"c#" only need a leading boundary
+    return re.compile(r"\b(?:" + groups + r")(?!\w)", re.I)
+
+
+_SKILLS_PATTERN = _skills_pattern(_KNOWN_SKILLS)
+
+_LABELED_FIELD = r"^\s*(?:{labels})\s*[:\-–]\s*(.+?)\s*$"
+_TITLE_LABEL = re.compile(_LABELED_FIELD.format(labels=r"job\s+title|title|position|role"), re.I | re.M)
+_COMPANY_LABEL = re.compile(_LABELED_FIELD.format(labels=r"company|employer|organization"), re.I | re.M)
+_LOCATION_LABEL = re.compile(_LABELED_FIELD.format(labels=r"location|job\s+location|work\s+location"), re.I | re.M)
+_BULLET = re.compile(r"^\s*(?:[-•*·▪●◦]|\d+[.)])\s+(.+)$")
+
+# Hosted ATS URLs that carry the company slug: boards.greenhouse.io/<company>/jobs/...
+_COMPANY_URL_PATTERNS = [
+    re.compile(r"(?:boards|job-boards)\.greenhouse\.io/([^/?#]+)"),
+    re.compile(r"jobs\.lever\.co/([^/?#]+)"),
+    re.compile(r"jobs\.ashbyhq\.com/([^/?#]+)"),
+    re.compile(r"([a-z0-9-]+)\.wd\d+\.myworkdayjobs\.com"),
+    re.compile(r"careers-([a-z0-9-]+)\.icims\.com"),
+]
+
+
+def extract_required_section(text: str) -> Optional[str]:
+    """
+    Return the required / must-have qualifications section, or None if the
+    posting has no recognizable one.
+    """
+    if not text:
+        return None
+
+    for pattern in _REQUIRED_SECTION_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            rest = text[match.end():]
+            next_section = _NEXT_SECTION.search(rest)
+            section = rest[:next_section.start()] if next_section and next_section.start() > 0 else rest[:2000]
+            return section.strip()
+    return None
+
+
+def extract_years_of_experience(text: str) -> Optional[str]:
+    """Pull out explicit years-of-experience mentions (e.g. '5+ years', '3-5 years')."""
+    if not text:
+        return None
+    for pattern in _YEARS_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            if match.lastindex and match.lastindex >= 2 and match.group(2):
+                return f"{match.group(1)}-{match.group(2)} years"
+            return f"{match.group(1)}+ years"
+    return None
+
+
+def extract_remote_policy(text: str, location: str = "") -> Optional[str]:
+    """Detect remote / hybrid / on-site signals."""
+    combined = f"{text or ''} {location or ''}".lower()
+    if re.search(r"\bfully\s*remote\b", combined):
+        return "Remote"
+    if re.search(r"\bremote\b", combined) and re.search(r"\bhybrid\b", combined):
+        return "Hybrid / Remote"
+    if re.search(r"\bhybrid\b", combined):
+        return "Hybrid"
+    if re.search(r"\bremote\b", combined):
+        return "Remote"
+    if re.search(r"\bon[- ]?site\b", combined) or re.search(r"\bin[- ]?office\b", combined):
+        return "On-site"
+    return None
+
+
+def extract_salary(text: str) -> Optional[str]:
+    """Extract a salary / compensation range."""
+    if not text:
+        return None
+    for pattern in _SALARY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(0).strip()
+    return None
+
+
+def extract_clearance(text: str) -> List[str]:
+    """Detect citizenship / security clearance / export control requirements."""
+    if not text:
+        return []
+    lower = text.lower()
+    return [label for pattern, label in _CLEARANCE_FLAGS if pattern.search(lower)]
+
+
+def extract_skills(required_section: Optional[str], full_text: str) -> List[str]:
+    """Extract known skills, preferring the required-qualifications section."""
+    source = required_section or full_text or ""
+    # First occurrence of each skill, reported in _KNOWN_SKILLS order
+    first: Dict[int, str] = {}
+    for match in _SKILLS_PATTERN.finditer(source):
+        index = int(match.lastgroup[1:])
+        if index not in first:
+            first[index] = match.group(match.lastgroup)
+    found = []
+    seen = set()
+    for index in sorted(first):
+        label = first[index]
+        normalized = label.lower().replace(".", "")
+        if normalized not in seen:
+            seen.add(normalized)
+            found.append(label)
+    return found
+
+
+def _extract_requirements(required_section: Optional[str]) -> List[str]:
+    """Turn the bullets of the required section into a requirements list."""
+    if not required_section:
+        return []
+    requirements = []
+    for line in required_section.splitlines():
+        bullet = _BULLET.match(line)
+        if bullet:
+            requirements.append(bullet.group(1).strip())
+    return requirements
+
+
+def _extract_company_from_url(job_url: str) -> Optional[str]:
+    """Read the company slug out of hosted ATS URLs (Greenhouse, Lever, Workday, ...)."""
+    if not job_url:
+        return None
+    for pattern in _COMPANY_URL_PATTERNS:
+        match = pattern.search(job_url.lower())
+        if match:
+            return match.group(1).replace("-", " ").title()
+    return None
+
+
+def _first_line(text: str) -> Optional[str]:
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            return line
+    return None
+
+
+def extract_job_fields(job_text: str, job_url: str = "") -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Fill every AnalyzeJobResponse field from local heuristics.
+
+    Args:
+        job_text: Scraped job posting text
+        job_url: Posting URL (used to infer the company on hosted ATS pages)
+
+    Returns:
+        Tuple of (fields, confidence) where confidence maps each field name to
+        a 0-1 score of how much the heuristic value can be trusted
+    """
+    text = job_text or ""
+    required_section = extract_required_section(text)
+    fields: Dict[str, Any] = {}
+    confidence: Dict[str, float] = {}
+
+    # Title: an explicit label is reliable, the first line is a guess
+    title_label = _TITLE_LABEL.search(text)
+    first_line = _first_line(text)
+    if title_label:
+        fields["title"], confidence["title"] = title_label.group(1), 0.9
+    elif first_line and len(first_line) <= 100:
+        # "Senior Engineer - Acme Corp" style headers
+        fields["title"], confidence["title"] = re.split(r"\s+[-–|@]\s+|\s+at\s+", first_line)[0], 0.5
+    else:
+        fields["title"], confidence["title"] = None, 0.0
+
+    company_label = _COMPANY_LABEL.search(text)
+    company_from_url = _extract_company_from_url(job_url)
+    header_company = re.search(r"\s+(?:[-–|@]|at)\s+(.+)$", first_line or "")
+    if company_label:
+        fields["company"], confidence["company"] = company_label.group(1), 0.9
+    elif company_from_url:
+        fields["company"], confidence["company"] = company_from_url, 0.8
+    elif header_company:
+        fields["company"], confidence["company"] = header_company.group(1).strip(), 0.5
+    else:
+        fields["company"], confidence["company"] = None, 0.0
+
+    requirements = _extract_requirements(required_section)
+    fields["requirements"] = requirements
+    confidence["requirements"] = 0.75 if len(requirements) >= 3 else 0.3
+
+    skills = extract_skills(required_section, text)
+    fields["skills"] = skills
+    confidence["skills"] = 0.75 if len(skills) >= 3 else 0.4
+
+    # Absence is informative: no "year" anywhere means no experience requirement
+    experience = extract_years_of_experience(text)
+    fields["experience"] = experience
+    confidence["experience"] = 0.9 if experience or not re.search(r"\byears?\b", text, re.I) else 0.4
+
+    # Same for pay: no dollar sign means no posted salary
+    salary = extract_salary(text)
+    fields["salary"] = salary
+    confidence["salary"] = 0.9 if salary or "$" not in text else 0.4
+
+    location_label = _LOCATION_LABEL.search(text)
+    remote_policy = extract_remote_policy(text)
+    if location_label:
+        location = location_label.group(1)
+        if remote_policy and remote_policy.split(" ")[0].lower() not in location.lower():
+            location = f"{location} ({remote_policy})"
+        fields["location"], confidence["location"] = location, 0.85
+    elif remote_policy:
+        fields["location"], confidence["location"] = remote_policy, 0.6
+    else:
+        fields["location"], confidence["location"] = None, 0.2
+
+    # Only the flags content.js knows about - an empty list may still hide a PhD requirement
+    disqualifiers = [flag for flag in extract_clearance(text) if flag != "Green Card Acceptable"]
+    fields["disqualifiers"] = disqualifiers
+    confidence["disqualifiers"] = 0.8 if disqualifiers else 0.5
+
+    return fields, confidence
+
+
+def low_confidence_fields(confidence: Dict[str, float], threshold: float = DEFAULT_CONFIDENCE_THRESHOLD) -> List[str]:
+    """Names of fields whose heuristic value should be confirmed by Claude."""
+    return [field for field, score in confidence.items() if score < threshold]
@@ -0,0 +1,155 @@
+"""
+JSON Repair - Tolerant parsing of almost-JSON model output
+
+Analysis and answers normally arrive as tool-call input, already parsed. This
+is the fallback for text responses that are almost JSON, so they don't cost
+a second Claude call. repair_json() makes one pass over the text, tracking
+open strings and containers, and fixes:
+
+- prose or markdown fences before and after the JSON value
+- trailing commas before } or ]
+- raw newlines / tabs inside strings
+- Python literals (True, False, None)
+- output cut off mid-value (max_tokens): the open string is closed, a
+  dangling key or separator dropped, and open containers closed; if that
+  still doesn't parse, it falls back to the last complete member
+
+Anything it can't make sense of raises ValueError.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def repair_json(text: str) -> Any:
+    """
+    Parse the first JSON object or array in `text`, repairing it if needed.
+
+    Args:
+        text: Model output that should contain a JSON value
+
+    Returns:
+        The parsed value
+
+    Raises:
+        ValueError: No JSON value could be recovered
+    """
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise ValueError("No JSON object or array found")
+
+    repaired, fallback = _scan(text[min(starts):])
+    try:
+        return json.loads(repaired, strict=False)
+    except ValueError:
+        if fallback is None:
+            raise
+    return json.loads(fallback, strict=False)
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    """Drop a dangling separator or key, then close the open containers."""
+    text = "".join(out).rstrip()
+    if text.endswith(","):
+        text = text[:-1].rstrip()
+    if text.endswith(":"):
+        text += " null"
+    elif stack and stack[-1] == "}" and text.endswith('"'):
+        # {"a": 1, "b"  - a key with no value: drop it
+        key_start = _string_start(text)
+        if key_start is not None and text[:key_start].rstrip().endswith(("{", ",")):
+            text = text[:key_start].rstrip().rstrip(",")
+    return text + "".join(reversed(stack))
+
+
+def _string_start(text: str) -> Optional[int]:
+    """Index of the opening quote of the string literal that ends `text`."""
+    index = len(text) - 2
+    while index >= 0:
+        if text[index] == '"':
+            backslashes = 0
+            while index - 1 - backslashes >= 0 and text[index - 1 - backslashes] == "\\":
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return index
+        index -= 1
+    return None
+
+
+def _scan(text: str) -> Tuple[str, Optional[str]]:
+    """
+    One pass over `text` (which starts at the JSON value).
+
+    Returns:
+        (repaired text, fallback text truncated to the last complete member or None)
+    """
+    out: List[str] = []
+    stack: List[str] = []  # closers of the open containers
+    in_string = False
+    escaped = False
+    last_complete = None  # (length of out, stack) after the last complete member
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(char)
+            elif char == "\\":
+                escaped = True
+                out.append(char)
+            elif char == '"':
+                in_string = False
+                out.append(char)
+            else:
+                out.append(_STRING_ESCAPES.get(char, char))
+            index += 1
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+        elif char in "}]":
+            if not stack:
+                break
+            # Trailing comma: {"a": 1,}
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(stack.pop())
+            if not stack:
+                return "".join(out), None  # ignore anything after the value
+            last_complete = (len(out), list(stack))
+        elif char == ",":
+            last_complete = (len(out), list(stack))
+            out.append(char)
+        elif char.isalpha():
+            end = index
+            while end < len(text) and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[index:end]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    # Ran out of input inside the value (truncated output)
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+    fallback = None
+    if last_complete is not None:
+        length, open_containers = last_complete
+        fallback = _close(out[:length], open_containers)
+    return _close(out, stack), fallback
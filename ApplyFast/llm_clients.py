@@ -0,0 +1,86 @@
+"""
+LLM Clients - Lazily constructed, shared Anthropic clients
+
+Importing the anthropic SDK and building a client (httpx pool, SSL context)
+is the slowest part of starting the API, and apply_fast_api.py and
+resume_generator.py used to each build their own at import time. Both now
+call get_async_client(), which builds one AsyncAnthropic - over one pooled
+httpx connection pool - the first time Claude is actually needed. A missing
+ANTHROPIC_API_KEY is reported then, not at import.
+
+get_sync_client() serves CLI code paths (generate_resume_with_analysis);
+httpx cannot share a pool between sync and async clients.
+"""
+
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import anthropic
+
+# Connection pool limits for the shared async client
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", 100))
+ANTHROPIC_MAX_KEEPALIVE = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", 20))
+
+_lock = threading.Lock()
+_async_client: Optional["anthropic.AsyncAnthropic"] = None
+_sync_client: Optional["anthropic.Anthropic"] = None
+
+
+def get_api_key() -> str:
+    """Read ANTHROPIC_API_KEY (from the environment or .env)."""
+    load_dotenv()
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+    return api_key
+
+
+def get_async_client() -> "anthropic.AsyncAnthropic":
+    """Return the process-wide AsyncAnthropic client, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                import anthropic
+                import httpx
+
+                _async_client = anthropic.AsyncAnthropic(
+                    api_key=get_api_key(),
+                    # resilience.py owns retries (backoff, deadlines, circuit breaker)
+                    max_retries=0,
+                    http_client=anthropic.DefaultAsyncHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                            max_keepalive_connections=ANTHROPIC_MAX_KEEPALIVE
+                        )
+                    )
+                )
+    return _async_client
+
+
+def get_sync_client() -> "anthropic.Anthropic":
+    """Return the process-wide synchronous Anthropic client, creating it on first use."""
+    global _sync_client
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                import anthropic
+
+                _sync_client = anthropic.Anthropic(api_key=get_api_key())
+    return _sync_client
+
+
+async def aclose_clients() -> None:
+    """Close whichever clients were created (call at shutdown)."""
+    global _async_client, _sync_client
+    with _lock:
+        async_client, _async_client = _async_client, None
+        sync_client, _sync_client = _sync_client, None
+    if async_client is not None:
+        await async_client.close()
+    if sync_client is not None:
+        sync_client.close()
@@ -0,0 +1,275 @@
+"""
+LLM Scheduler - Priority lanes over shared requests/tokens-per-minute budgets
+
+Every Claude call the API makes is admitted here first. Calls wait in one of
+three lanes - "interactive" (screening-question answers and single-job
+analysis the Chrome extension is blocked on), "resume", then "bulk"
+(/analyze-jobs) - and are admitted strictly in lane order, FIFO within a lane,
+as two token buckets sized to the org's rate limits allow:
+
+    CLAUDE_RPM_LIMIT   requests per minute (0 disables the limit)
+    CLAUDE_TPM_LIMIT   input + output tokens per minute (0 disables the limit)
+
+Lower lanes may not drain the buckets completely: "resume" leaves 10% and
+"bulk" 30% of each bucket for interactive calls, so a bulk run soaks up spare
+capacity without adding queueing delay to the answers a user is waiting on.
+
+A call reserves its estimated tokens (prompt + max_tokens) on admission; once
+the response's usage is known the reservation is settled to the real count,
+and reservations that never reach Claude are refunded.
+
+Queue depth, queue wait and admissions are exported per lane on /metrics.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from metrics import LLM_ADMITTED, LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT_SECONDS
+
+LANE_INTERACTIVE = "interactive"
+LANE_RESUME = "resume"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_RESUME, LANE_BULK)  # highest priority first
+
+# Share of each bucket a lane must leave for the lanes above it
+LANE_HEADROOM = {LANE_INTERACTIVE: 0.0, LANE_RESUME: 0.1, LANE_BULK: 0.3}
+
+CLAUDE_RPM_LIMIT = int(os.getenv("CLAUDE_RPM_LIMIT", 50))
+CLAUDE_TPM_LIMIT = int(os.getenv("CLAUDE_TPM_LIMIT", 40000))
+
+# Rough chars-per-token ratio for estimating prompt size before the call
+CHARS_PER_TOKEN = 4
+
+
+def estimate_request_tokens(prompt: Any, system: Any = None, max_tokens: int = 0) -> int:
+    """
+    Upper-bound token estimate for one request, reserved until usage is known.
+
+    Args:
+        prompt: User message (string or content blocks)
+        system: Optional system prompt (string or content blocks)
+        max_tokens: Completion token limit (output is reserved at the maximum)
+    """
+    chars = sum(len(part if isinstance(part, str) else json.dumps(part)) for part in (prompt, system) if part)
+    return chars // CHARS_PER_TOKEN + max_tokens
+
+
+def usage_tokens(usage: Any) -> int:
+    """Tokens a response counts against the TPM budget (cache reads excluded)."""
+    return sum(
+        getattr(usage, field, None) or 0
+        for field in ("input_tokens", "cache_creation_input_tokens", "output_tokens")
+    )
+
+
+class TokenBucket:
+    """
+    Continuously refilling bucket holding up to one minute of budget.
+
+    Args:
+        per_minute: Budget per minute; 0 means unlimited
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, headroom: float = 0.0) -> float:
+        """Seconds until `amount` can be taken while leaving `headroom` of capacity."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        # Never ask for more than the bucket can ever hold at this lane's headroom
+        floor = self.capacity * headroom
+        needed = min(amount, self.capacity - floor) + floor
+        return max(0.0, (needed - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact; may go into debt."""
+        if not self.unlimited:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+class Reservation:
+    """Tokens held for one admitted call until its real usage is known."""
+
+    def __init__(self, scheduler: "LLMScheduler", tokens: int):
+        self._scheduler = scheduler
+        self._reserved = tokens
+        self._settled = False
+
+    def settle(self, usage: Any) -> None:
+        """
+        Replace the estimate with a response's actual usage. Further calls
+        (another attempt or a hedged request) charge their usage on top.
+        """
+        self._scheduler._adjust_tokens(usage_tokens(usage) - self._reserved)
+        self._reserved = 0
+        self._settled = True
+
+    def close(self) -> None:
+        """Refund the estimate of a call that never produced a response."""
+        if not self._settled and self._reserved:
+            self._scheduler._adjust_tokens(-self._reserved)
+            self._reserved = 0
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "lane", "tokens", "loop", "event")
+
+    def __init__(self, priority: int, seq: int, lane: str, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.lane = lane
+        self.tokens = tokens
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self.event.set)
+        except RuntimeError:
+            pass  # its event loop has closed
+
+
+class LLMScheduler:
+    """
+    Admits Claude calls in priority order within the RPM/TPM budgets.
+
+    Args:
+        rpm_limit: Requests per minute (0 = unlimited)
+        tpm_limit: Tokens per minute (0 = unlimited)
+    """
+
+    def __init__(self, rpm_limit: int = CLAUDE_RPM_LIMIT, tpm_limit: int = CLAUDE_TPM_LIMIT):
+        self.requests = TokenBucket(rpm_limit)
+        self.tokens = TokenBucket(tpm_limit)
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def _wait_time(self, waiter: _Waiter) -> float:
+        headroom = LANE_HEADROOM[waiter.lane]
+        return max(self.requests.wait_time(1, headroom), self.tokens.wait_time(waiter.tokens, headroom))
+
+    def _wake_head(self) -> None:
+        # Caller holds the lock
+        if self._queue:
+            self._queue[0].wake()
+
+    def _adjust_tokens(self, amount: float) -> None:
+        with self._lock:
+            self.tokens.adjust(amount)
+            if amount < 0:
+                self._wake_head()
+
+    async def _admit(self, lane: str, tokens: int) -> Reservation:
+        if lane not in LANE_HEADROOM:
+            raise ValueError(f"Unknown lane: {lane}")
+        waiter = _Waiter(LANES.index(lane), next(self._seq), lane, tokens)
+        start = time.perf_counter()
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        LLM_QUEUE_DEPTH.inc(lane=lane)
+        try:
+            while True:
+                with self._lock:
+                    if self._queue[0] is waiter:
+                        wait = self._wait_time(waiter)
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            self._wake_head()
+                            break
+                    else:
+                        wait = None  # not at the head: sleep until the waiter ahead leaves
+                    waiter.event.clear()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            # Cancelled while queued: give up the place in line
+            with self._lock:
+                if waiter in self._queue:
+                    was_head = self._queue[0] is waiter
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                    if was_head:
+                        self._wake_head()
+            raise
+        finally:
+            LLM_QUEUE_DEPTH.dec(lane=lane)
+
+        LLM_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - start, lane=lane)
+        LLM_ADMITTED.inc(lane=lane)
+        return Reservation(self, tokens)
+
+    @asynccontextmanager
+    async def reserve(self, lane: str, tokens: int, timeout: Optional[float] = None) -> AsyncIterator[Reservation]:
+        """
+        Wait for admission in `lane`, then hold `tokens` for the call made in
+        the body. Call reservation.settle(message.usage) once usage is known;
+        an unsettled reservation is refunded on exit.
+
+        Args:
+            lane: "interactive", "resume" or "bulk"
+            tokens: Estimated tokens (see estimate_request_tokens)
+            timeout: Seconds to wait for admission (None waits as long as it takes)
+
+        Raises:
+            asyncio.TimeoutError: Not admitted within `timeout`; the place in line is given up
+        """
+        reservation = await asyncio.wait_for(self._admit(lane, tokens), timeout)
+        try:
+            yield reservation
+        finally:
+            reservation.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = {lane: 0 for lane in LANES}
+            for waiter in self._queue:
+                queued[waiter.lane] += 1
+            for bucket in (self.requests, self.tokens):
+                if not bucket.unlimited:
+                    bucket._refill()
+            return {
+                "queued": queued,
+                "rpmLimit": int(self.requests.capacity),
+                "tpmLimit": int(self.tokens.capacity),
+                "requestsAvailable": None if self.requests.unlimited else round(self.requests.level, 1),
+                "tokensAvailable": None if self.tokens.unlimited else round(self.tokens.level)
+            }
+
+
+# One scheduler per process: the rate limits are shared by every call site
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,325 @@
+"""
+Metrics - In-process counters, gauges and histograms for the ApplyFast API
+
+Tracks Claude token usage per call site (input/output plus prompt-cache reads
+and writes from each response's `usage` field), job-text compaction savings,
+HTTP and Claude latency, in-flight requests, LLM scheduler queues, model
+routing (per-model latency, cost and escalations), retries, hedges,
+circuit-breaker state and fallbacks, JSON repairs and parse failures and
+SQLite query timings.
+render_prometheus() exposes everything in the Prometheus text format for
+GET /metrics.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+_lock = threading.Lock()
+_usage: Dict[str, Dict[str, int]] = {}
+_compaction = {"requests": 0, "originalTokens": 0, "compactedTokens": 0}
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens"
+)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LLM_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 45, 60, 90, 120)
+QUEUE_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+
+
+# ══════════════════════════════════════════════════════════════════
+#  METRIC TYPES
+# ══════════════════════════════════════════════════════════════════
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class: a named family of values keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with _lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with _lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with _lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state["counts"]):
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {state['count']}")
+                plain = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{plain} {state['sum']}")
+                lines.append(f"{self.name}_count{plain} {state['count']}")
+        return lines
+
+
+_registry: List[_Metric] = []
+_collectors: List[Callable[[], List[str]]] = []
+
+
+# ══════════════════════════════════════════════════════════════════
+#  METRICS
+# ══════════════════════════════════════════════════════════════════
+
+HTTP_REQUESTS = Counter(
+    "applyfast_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "applyfast_http_request_duration_seconds", "Time to response headers per endpoint", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge(
+    "applyfast_http_requests_in_flight", "HTTP requests currently being handled"
+)
+CLAUDE_REQUEST_SECONDS = Histogram(
+    "applyfast_claude_request_duration_seconds", "Claude API call latency per call site",
+    ("call_site", "outcome"), buckets=LLM_BUCKETS
+)
+CLAUDE_IN_FLIGHT = Gauge(
+    "applyfast_claude_requests_in_flight", "Claude API calls currently awaiting a response", ("call_site",)
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "applyfast_llm_queue_depth", "Claude calls waiting for admission by the LLM scheduler", ("lane",)
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "applyfast_llm_queue_wait_seconds", "Time Claude calls waited for admission", ("lane",),
+    buckets=QUEUE_BUCKETS
+)
+LLM_ADMITTED = Counter(
+    "applyfast_llm_admitted_total", "Claude calls admitted by the LLM scheduler", ("lane",)
+)
+LLM_ROUTE_SECONDS = Histogram(
+    "applyfast_llm_route_duration_seconds", "Claude call latency per call site and model",
+    ("call_site", "model"), buckets=LLM_BUCKETS
+)
+LLM_ROUTE_COST = Counter(
+    "applyfast_llm_route_cost_usd_total", "Estimated Claude spend per call site and model", ("call_site", "model")
+)
+LLM_ROUTE_DECISIONS = Counter(
+    "applyfast_llm_route_decisions_total", "Model chosen per call site, by routing reason",
+    ("call_site", "model", "reason")
+)
+LLM_ROUTE_ESCALATIONS = Counter(
+    "applyfast_llm_route_escalations_total", "Calls re-run on the strong model after the fast model's output",
+    ("call_site", "reason")
+)
+CLAUDE_RETRIES = Counter(
+    "applyfast_claude_retries_total", "Claude calls retried after a retryable failure", ("call_site", "reason")
+)
+CLAUDE_HEDGED = Counter(
+    "applyfast_claude_hedged_requests_total",
+    "Hedged duplicate Claude requests (outcome: sent, or which request won)", ("call_site", "outcome")
+)
+CLAUDE_CIRCUIT_OPEN = Gauge(
+    "applyfast_claude_circuit_open", "1 while the Claude circuit breaker is open", ("breaker",)
+)
+CLAUDE_FALLBACKS = Counter(
+    "applyfast_claude_fallbacks_total", "Responses served without Claude while it was unavailable",
+    ("call_site", "source")
+)
+JSON_PARSE_FAILURES = Counter(
+    "applyfast_json_parse_failures_total", "Claude responses that could not be parsed as JSON", ("call_site",)
+)
+JSON_REPAIRS = Counter(
+    "applyfast_json_repairs_total", "Malformed Claude JSON responses recovered by json_repair", ("call_site",)
+)
+SQLITE_QUERY_SECONDS = Histogram(
+    "applyfast_sqlite_query_duration_seconds", "SQLite statement execution time", ("operation",),
+    buckets=DB_BUCKETS
+)
+
+
+@contextmanager
+def track_claude_call(call_site: str) -> Iterator[None]:
+    """
+    Time a Claude API call and count it as in flight while it runs.
+    Safe to wrap an await - only wall-clock time is measured.
+    """
+    CLAUDE_IN_FLIGHT.inc(call_site=call_site)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        CLAUDE_IN_FLIGHT.dec(call_site=call_site)
+        CLAUDE_REQUEST_SECONDS.observe(time.perf_counter() - start, call_site=call_site, outcome=outcome)
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """Register a callback that returns extra exposition lines at scrape time."""
+    _collectors.append(collector)
+
+
+# ══════════════════════════════════════════════════════════════════
+#  TOKEN USAGE
+# ══════════════════════════════════════════════════════════════════
+
+def record_usage(call_site: str, usage: Any) -> None:
+    """
+    Add one response's token usage to the running totals for a call site.
+
+    Args:
+        call_site: Which code path made the call (e.g. "analyze_job")
+        usage: The `usage` object from an Anthropic Message (cache fields may be absent)
+    """
+    with _lock:
+        totals = _usage.setdefault(call_site, {"calls": 0, **{field: 0 for field in USAGE_FIELDS}})
+        totals["calls"] += 1
+        for field in USAGE_FIELDS:
+            totals[field] += getattr(usage, field, None) or 0
+
+
+def usage_snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Return per-call-site token totals with the share of prompt tokens read from cache.
+    """
+    with _lock:
+        snapshot = {}
+        for call_site, totals in _usage.items():
+            prompt_tokens = (
+                totals["input_tokens"]
+                + totals["cache_read_input_tokens"]
+                + totals["cache_creation_input_tokens"]
+            )
+            snapshot[call_site] = {
+                **totals,
+                "cacheReadRatio": round(totals["cache_read_input_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+            }
+        return snapshot
+
+
+def record_compaction(original_tokens: int, compacted_tokens: int) -> None:
+    """Add one compacted job text to the running compaction totals."""
+    with _lock:
+        _compaction["requests"] += 1
+        _compaction["originalTokens"] += original_tokens
+        _compaction["compactedTokens"] += compacted_tokens
+
+
+def compaction_snapshot() -> Dict[str, Any]:
+    """Return compaction totals and the average share of job-text tokens removed."""
+    with _lock:
+        saved = _compaction["originalTokens"] - _compaction["compactedTokens"]
+        return {
+            **_compaction,
+            "tokensSaved": saved,
+            "savedRatio": round(saved / _compaction["originalTokens"], 4) if _compaction["originalTokens"] else 0.0
+        }
+
+
+def _render_usage() -> List[str]:
+    """Expose the usage and compaction totals as Prometheus counters."""
+    lines = [
+        "# HELP applyfast_claude_tokens_total Claude tokens by call site and kind (from response usage)",
+        "# TYPE applyfast_claude_tokens_total counter"
+    ]
+    with _lock:
+        for call_site, totals in sorted(_usage.items()):
+            for field in USAGE_FIELDS:
+                kind = field.replace("_input_tokens", "").replace("_tokens", "")
+                labels = _format_labels(("call_site", "kind"), (call_site, kind))
+                lines.append(f"applyfast_claude_tokens_total{labels} {totals[field]}")
+        lines += [
+            "# HELP applyfast_job_compaction_tokens_total Estimated job-text tokens before and after compaction",
+            "# TYPE applyfast_job_compaction_tokens_total counter",
+            f'applyfast_job_compaction_tokens_total{{stage="original"}} {_compaction["originalTokens"]}',
+            f'applyfast_job_compaction_tokens_total{{stage="compacted"}} {_compaction["compactedTokens"]}'
+        ]
+    return lines
+
+
+def render_prometheus() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    lines.extend(_render_usage())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
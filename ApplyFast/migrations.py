@@ -0,0 +1,334 @@
+"""
+Schema Migrations - Versioned, forward-only schema changes for applyfast.db
+
+Each migration runs once, in order, inside its own transaction. The schema
+version is stored in SQLite's built-in `PRAGMA user_version`, so a fresh
+database and one created before migrations existed (user_version 0, tables
+already present) both end up at the latest version. Migration 1 uses
+IF NOT EXISTS throughout for exactly that reason.
+
+To change the schema, append a migration - never edit one that has shipped.
+"""
+
+import sqlite3
+from typing import Callable, Dict, List, Tuple, Union
+
+from url_canon import canonicalize_job_url
+
+# A step is a SQL statement or a callable that receives the connection
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+APPLICATIONS_FTS_TABLE = "applications_fts"
+
+
+def _create_applications_fts(conn: sqlite3.Connection) -> None:
+    """
+    Full-text index over company, title and job_url.
+
+    The trigram tokenizer makes MATCH and LIKE '%x%' substring searches use the
+    index (for patterns of 3+ characters). It is an external-content table, so
+    rows are stored once in `applications` and the triggers keep the index in sync.
+    SQLite builds without FTS5 or trigram support (< 3.34) skip this step and
+    /applications keeps using plain LIKE filters.
+    """
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {APPLICATIONS_FTS_TABLE} USING fts5(
+                company, title, job_url,
+                content='applications', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"⚠️  FTS5 trigram search unavailable ({e}); /applications will use LIKE filters")
+        return
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+            INSERT INTO {APPLICATIONS_FTS_TABLE} (rowid, company, title, job_url)
+            VALUES (new.id, new.company, new.title, new.job_url);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+            INSERT INTO {APPLICATIONS_FTS_TABLE} ({APPLICATIONS_FTS_TABLE}, rowid, company, title, job_url)
+            VALUES ('delete', old.id, old.company, old.title, old.job_url);
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS applications_fts_update
+        AFTER UPDATE OF company, title, job_url ON applications BEGIN
+            INSERT INTO {APPLICATIONS_FTS_TABLE} ({APPLICATIONS_FTS_TABLE}, rowid, company, title, job_url)
+            VALUES ('delete', old.id, old.company, old.title, old.job_url);
+            INSERT INTO {APPLICATIONS_FTS_TABLE} (rowid, company, title, job_url)
+            VALUES (new.id, new.company, new.title, new.job_url);
+        END
+    """)
+    # Backfill rows logged before the index existed
+    conn.execute(f"INSERT INTO {APPLICATIONS_FTS_TABLE} ({APPLICATIONS_FTS_TABLE}) VALUES ('rebuild')")
+
+
+# Rollup tables behind GET /applications/stats: (table, key column, expression
+# over a row of `applications`, condition for the row to be counted).
+# NULL statuses are stored as '' because NULLs never conflict in a primary key.
+APPLICATION_ROLLUPS = [
+    ("application_status_counts", "status", "COALESCE({row}.status, '')", "1"),
+    ("application_company_counts", "company", "{row}.company", "{row}.company IS NOT NULL"),
+    ("application_day_counts", "day", "DATE({row}.created_at)", "{row}.created_at IS NOT NULL"),
+]
+
+
+def _rollup_add(table: str, key: str, expr: str, cond: str, row: str, delta: int) -> str:
+    """Trigger statement that adds delta to the rollup row for `row` (new or old)"""
+    return (
+        f"INSERT INTO {table} ({key}, count) SELECT {expr.format(row=row)}, {delta} "
+        f"WHERE {cond.format(row=row)} "
+        f"ON CONFLICT({key}) DO UPDATE SET count = count + excluded.count;"
+    )
+
+
+def _rollup_prune(table: str, key: str, expr: str, cond: str, row: str) -> str:
+    """Trigger statement that drops the rollup row for `row` once its count reaches zero"""
+    return f"DELETE FROM {table} WHERE {key} = {expr.format(row=row)} AND count <= 0;"
+
+
+def _create_application_rollups(conn: sqlite3.Connection) -> None:
+    """
+    Per-status, per-company and per-day application counts, maintained by
+    triggers on every insert, delete and update of `applications` so the stats
+    endpoint reads a handful of small rows instead of aggregating the table.
+    """
+    inserts, deletes, updates = [], [], []
+    for table, key, expr, cond in APPLICATION_ROLLUPS:
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({key} TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_count ON {table}(count)")
+        inserts.append(_rollup_add(table, key, expr, cond, "new", 1))
+        deletes += [_rollup_add(table, key, expr, cond, "old", -1), _rollup_prune(table, key, expr, cond, "old")]
+        updates += [
+            _rollup_add(table, key, expr, cond, "old", -1),
+            _rollup_prune(table, key, expr, cond, "old"),
+            _rollup_add(table, key, expr, cond, "new", 1),
+        ]
+
+    conn.execute("CREATE TABLE IF NOT EXISTS application_totals (id INTEGER PRIMARY KEY CHECK (id = 1), count INTEGER NOT NULL)")
+    inserts.append("UPDATE application_totals SET count = count + 1 WHERE id = 1;")
+    deletes.append("UPDATE application_totals SET count = count - 1 WHERE id = 1;")
+
+    newline = "\n            "
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS application_rollups_insert AFTER INSERT ON applications BEGIN
+            {newline.join(inserts)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS application_rollups_delete AFTER DELETE ON applications BEGIN
+            {newline.join(deletes)}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS application_rollups_update
+        AFTER UPDATE OF status, company, created_at ON applications BEGIN
+            {newline.join(updates)}
+        END
+    """)
+    rebuild_application_rollups(conn)
+
+
+def rebuild_application_rollups(conn: sqlite3.Connection) -> None:
+    """
+    Recompute every rollup from the applications table (repairs drift, e.g.
+    after rows were edited with triggers disabled). Runs in the caller's
+    transaction; commit afterwards.
+    """
+    for table, key, expr, cond in APPLICATION_ROLLUPS:
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"INSERT INTO {table} ({key}, count) "
+            f"SELECT {expr.format(row='a')}, COUNT(*) FROM applications a "
+            f"WHERE {cond.format(row='a')} GROUP BY 1"
+        )
+    conn.execute("INSERT OR REPLACE INTO application_totals (id, count) SELECT 1, COUNT(*) FROM applications")
+
+
+def _add_canonical_urls(conn: sqlite3.Connection) -> None:
+    """
+    Add applications.canonical_url (see url_canon.py) with a unique index.
+
+    Existing duplicates are left in place: only the most recent row for each
+    canonical URL gets the column set, older ones keep NULL (which the unique
+    index ignores) so no history is deleted.
+    """
+    conn.execute("ALTER TABLE applications ADD COLUMN canonical_url TEXT")
+
+    newest: Dict[str, int] = {}
+    for row in conn.execute("SELECT id, job_url FROM applications ORDER BY id"):
+        canonical = canonicalize_job_url(row[1])
+        if canonical:
+            newest[canonical] = row[0]
+    conn.executemany(
+        "UPDATE applications SET canonical_url = ? WHERE id = ?",
+        list(newest.items())
+    )
+    conn.execute("CREATE UNIQUE INDEX idx_applications_canonical_url ON applications(canonical_url)")
+
+
+# (version, description, steps) - versions must be consecutive
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "initial schema", [
+        """
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_url TEXT NOT NULL,
+            company TEXT,
+            title TEXT,
+            status TEXT,
+            resume_used TEXT,
+            timestamp TEXT NOT NULL,
+            metadata TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            cache_key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_accessed
+        ON analysis_cache(last_accessed)
+        """,
+        # Message Batches submitted by bulk_analyze.py and their per-posting items
+        """
+        CREATE TABLE IF NOT EXISTS analysis_batches (
+            batch_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            request_count INTEGER NOT NULL,
+            submitted_at TEXT NOT NULL,
+            ingested_at TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS analysis_batch_items (
+            batch_id TEXT NOT NULL,
+            custom_id TEXT NOT NULL,
+            job_url TEXT,
+            status TEXT NOT NULL,
+            error TEXT,
+            PRIMARY KEY (batch_id, custom_id)
+        )
+        """,
+    ]),
+    (2, "applications indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_applications_created_at ON applications(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_company ON applications(company)",
+    ]),
+    (3, "applications full-text search", [
+        _create_applications_fts,
+    ]),
+    (4, "application stats rollups", [
+        _create_application_rollups,
+    ]),
+    (5, "canonical job URLs", [
+        _add_canonical_urls,
+    ]),
+    # Screening-question answers reused by answer_store.py. Learned answers are
+    # per profile and record the company they were written for; overrides have
+    # profile_key ''.
+    (6, "screening answer store", [
+        """
+        CREATE TABLE IF NOT EXISTS answer_store (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_key TEXT NOT NULL,
+            company TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            confidence TEXT NOT NULL,
+            source TEXT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            UNIQUE (profile_key, company, question)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_answer_store_last_used ON answer_store(source, last_used)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply every migration newer than the database's user_version.
+
+    Safe to run from several processes at once: each migration re-checks the
+    version under the write lock, so exactly one process applies it.
+
+    Args:
+        conn: Open connection (must not be inside a transaction)
+
+    Returns:
+        The schema version after migrating
+    """
+    current = get_version(conn)
+    for version, description, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        # Another process (e.g. a second uvicorn worker) may have applied it while we waited
+        # for the write lock; re-read the version now that no one else can change it
+        current = get_version(conn)
+        if version <= current:
+            conn.rollback()
+            continue
+        try:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            # PRAGMA values can't be bound parameters; version is an int from MIGRATIONS
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"🗄️  Applied migration {version}: {description}")
+        current = version
+    return current
+
+
+def has_table(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ApplyFast database maintenance")
+    parser.add_argument("--db", default="applyfast.db", help="Path to the SQLite database")
+    parser.add_argument("--rebuild-rollups", action="store_true",
+                        help="Recompute the /applications/stats rollup tables from applications")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    version = migrate(conn)
+    print(f"🗄️  Schema version {version} (latest {LATEST_VERSION})")
+
+    if args.rebuild_rollups:
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_application_rollups(conn)
+        conn.commit()
+        total = conn.execute("SELECT count FROM application_totals").fetchone()[0]
+        print(f"✅ Rebuilt stats rollups ({total} applications)")
+    conn.close()
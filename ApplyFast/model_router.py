@@ -0,0 +1,301 @@
+"""
+Model Router - Pick the Claude model per call site and request complexity
+
+Most Claude traffic is simple: a yes/no screening question ("Are you
+authorized to work in the US?") or pulling a handful of fields out of a
+compacted job posting. Those go to a fast, cheap model; open-ended answers,
+long postings and resume writing go to the strong model. When the fast model's
+output fails validation (unparseable JSON, a schema mismatch) or it isn't
+confident in its answer, the call is retried once on the strong model.
+
+Each call site has a policy - "auto" (route by complexity), "fast" or
+"strong" - overridable per site with CLAUDE_ROUTE_<CALL_SITE>, e.g.
+CLAUDE_ROUTE_ANSWER_QUESTION=strong. The models themselves come from
+CLAUDE_MODEL and CLAUDE_FAST_MODEL.
+
+Latency, token cost (from a per-model price table) and escalations are
+recorded per call site and model for /usage and /metrics.
+
+Prompt-cache breakpoints only work on prefixes of at least the model's minimum
+cacheable length (CACHE_MIN_TOKENS); the API silently ignores shorter ones.
+strip_short_cache_breakpoints() drops those before a call, so a breakpoint in
+a request means the prefix can actually be cached.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from metrics import (
+    LLM_ROUTE_COST, LLM_ROUTE_DECISIONS, LLM_ROUTE_ESCALATIONS, LLM_ROUTE_SECONDS, USAGE_FIELDS
+)
+from llm_scheduler import CHARS_PER_TOKEN
+from resilience import ClaudeUnavailableError
+
+T = TypeVar("T")
+
+STRONG_MODEL = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-20250514")
+FAST_MODEL = os.getenv("CLAUDE_FAST_MODEL", "claude-3-5-haiku-20241022")
+
+# Default policy per call site; anything unlisted uses the strong model
+DEFAULT_POLICIES = {
+    "answer_question": "auto",
+    "answer_questions": "auto",
+    "analyze_job": "auto",
+    "generate_tailored_resume": "strong",
+}
+
+# "auto" sends prompts above this many (estimated) input tokens to the strong model
+FAST_MAX_INPUT_TOKENS = int(os.getenv("CLAUDE_FAST_MAX_INPUT_TOKENS", 2500))
+
+# USD per million tokens: (input, output). Cache writes cost 1.25x input, cache reads 0.1x.
+MODEL_PRICES = {
+    "claude-opus-4": (15.00, 75.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+# Shortest prefix (tools + system + messages up to the breakpoint) each model
+# will cache. CLAUDE_CACHE_MIN_TOKENS raises the floor for every model, for
+# deployments that cache less eagerly than documented
+CACHE_MIN_TOKENS = {
+    "claude-3-5-haiku": 2048,
+    "claude-3-haiku": 2048,
+}
+DEFAULT_CACHE_MIN_TOKENS = int(os.getenv("CLAUDE_CACHE_MIN_TOKENS", 1024))
+# Tool-use system prompt the API adds to the prefix when tools are sent
+TOOL_USE_SYSTEM_TOKENS = 300
+
+# Screening questions with a short factual answer the profile already holds
+SIMPLE_QUESTION_PATTERNS = [
+    r"\b(authori[sz]ed|eligible|legally)\b.*\bwork\b",
+    r"\bsponsor(ship)?\b",
+    r"\bvisa\b",
+    r"\brelocat(e|ion)\b",
+    r"\bhow many years\b",
+    r"\byears of (professional )?experience\b",
+    r"\b(start date|notice period|when can you start)\b",
+    r"\b(salary|compensation|pay) (expectation|requirement|range)s?\b",
+    r"\b(degree|bachelor'?s?|master'?s?|certification|certified|licen[sc]e)\b",
+    r"\b(willing|able) to (travel|commute|work (on-?site|remote|hybrid))\b",
+    r"\b(18 years|over the age|background check|drug (test|screen))\b",
+    r"\b(linkedin|github|portfolio|website|phone|email|address|city|zip)\b",
+    r"\b(are|do|have|can|will|is) you\b.*\?\s*$",
+]
+# Questions that want an essay, regardless of how they start
+OPEN_ENDED_PATTERNS = [
+    r"\b(why|describe|explain|tell us|tell me|share|walk us|what interests|what excites)\b",
+    r"\b(cover letter|motivat|passion|challenge|accomplishment|example of a time)\b",
+]
+OPEN_ENDED_MIN_CHARS = 200
+
+_simple_re = re.compile("|".join(SIMPLE_QUESTION_PATTERNS), re.IGNORECASE)
+_open_ended_re = re.compile("|".join(OPEN_ENDED_PATTERNS), re.IGNORECASE)
+
+
+_lock = threading.Lock()
+_routes: Dict[str, Dict[str, Dict[str, float]]] = {}
+_escalations: Dict[str, int] = {}
+
+
+def policy_for(call_site: str) -> str:
+    """The routing policy for a call site: "auto", "fast" or "strong"."""
+    policy = os.getenv(f"CLAUDE_ROUTE_{call_site.upper()}", DEFAULT_POLICIES.get(call_site, "strong"))
+    return policy if policy in ("auto", "fast", "strong") else "strong"
+
+
+def classify_question(question: str) -> str:
+    """
+    Return "simple" for short factual screening questions, else "open_ended".
+    Essay cues win over factual ones ("Why are you willing to relocate?").
+    """
+    question = question.strip()
+    if len(question) >= OPEN_ENDED_MIN_CHARS or _open_ended_re.search(question):
+        return "open_ended"
+    return "simple" if _simple_re.search(question) else "open_ended"
+
+
+def choose_model(call_site: str, input_tokens: int = 0, questions: Sequence[str] = ()) -> str:
+    """
+    Pick the model for one call.
+
+    Args:
+        call_site: Which code path is calling (e.g. "answer_question")
+        input_tokens: Estimated prompt size
+        questions: The screening question(s) being answered; any open-ended
+            one sends the whole call to the strong model
+
+    Returns:
+        The model name
+    """
+    policy = policy_for(call_site)
+    if policy != "auto":
+        model, reason = (FAST_MODEL if policy == "fast" else STRONG_MODEL), "policy"
+    elif input_tokens > FAST_MAX_INPUT_TOKENS:
+        model, reason = STRONG_MODEL, "long_input"
+    elif any(classify_question(question) == "open_ended" for question in questions):
+        model, reason = STRONG_MODEL, "open_ended"
+    else:
+        model, reason = FAST_MODEL, "simple"
+    LLM_ROUTE_DECISIONS.inc(call_site=call_site, model=model, reason=reason)
+    return model
+
+
+def _prices(model: str) -> Optional[tuple]:
+    for prefix, prices in MODEL_PRICES.items():
+        if model.startswith(prefix):
+            return prices
+    return None
+
+
+def cache_min_tokens(model: str) -> int:
+    """Minimum cacheable prefix length for a model."""
+    for prefix, minimum in CACHE_MIN_TOKENS.items():
+        if model.startswith(prefix):
+            return max(minimum, DEFAULT_CACHE_MIN_TOKENS)
+    return DEFAULT_CACHE_MIN_TOKENS
+
+
+def strip_short_cache_breakpoints(
+    model: str,
+    system: Optional[List[Dict[str, Any]]],
+    prompt: Union[str, List[Dict[str, Any]], None] = None,
+    tools: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[Optional[List[Dict[str, Any]]], Union[str, List[Dict[str, Any]], None]]:
+    """
+    Remove cache_control from blocks whose prefix (tools, then system, then
+    prompt blocks, in the order the API caches them) is estimated to be
+    shorter than `model`'s minimum. The blocks are copied, not modified, so the
+    same prompt can be sent to a model with a different minimum.
+
+    Returns:
+        (system, prompt) to send
+    """
+    minimum = cache_min_tokens(model)
+    prefix_tokens = len(json.dumps(tools)) // CHARS_PER_TOKEN + TOOL_USE_SYSTEM_TOKENS if tools else 0
+
+    def strip(blocks: Any) -> Any:
+        nonlocal prefix_tokens
+        if not isinstance(blocks, list):
+            if blocks:
+                prefix_tokens += len(blocks) // CHARS_PER_TOKEN
+            return blocks
+        kept = []
+        for block in blocks:
+            text = block.get("text")
+            prefix_tokens += len(text if isinstance(text, str) else json.dumps(block)) // CHARS_PER_TOKEN
+            if "cache_control" in block and prefix_tokens < minimum:
+                block = {key: value for key, value in block.items() if key != "cache_control"}
+            kept.append(block)
+        return kept
+
+    return strip(system), strip(prompt)
+
+
+def estimate_cost(model: str, usage: Any) -> float:
+    """USD cost of one response's usage (0 for models missing from MODEL_PRICES)."""
+    prices = _prices(model)
+    if prices is None:
+        return 0.0
+    input_price, output_price = prices
+    tokens = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+    return (
+        tokens["input_tokens"] * input_price
+        + tokens["cache_creation_input_tokens"] * input_price * 1.25
+        + tokens["cache_read_input_tokens"] * input_price * 0.1
+        + tokens["output_tokens"] * output_price
+    ) / 1_000_000
+
+
+def record_route_call(call_site: str, model: str, seconds: float, usage: Any) -> None:
+    """Add one completed call's latency and cost to its route's totals."""
+    cost = estimate_cost(model, usage)
+    LLM_ROUTE_SECONDS.observe(seconds, call_site=call_site, model=model)
+    LLM_ROUTE_COST.inc(cost, call_site=call_site, model=model)
+    with _lock:
+        totals = _routes.setdefault(call_site, {}).setdefault(model, {"calls": 0, "seconds": 0.0, "costUsd": 0.0})
+        totals["calls"] += 1
+        totals["seconds"] += seconds
+        totals["costUsd"] += cost
+
+
+def route_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Per call site: calls, mean latency and cost per model, plus escalations."""
+    with _lock:
+        snapshot = {}
+        for call_site, models in _routes.items():
+            snapshot[call_site] = {
+                "models": {
+                    model: {
+                        "calls": totals["calls"],
+                        "avgLatencyMs": round(totals["seconds"] / totals["calls"] * 1000, 1),
+                        "costUsd": round(totals["costUsd"], 6)
+                    }
+                    for model, totals in models.items()
+                },
+                "escalations": _escalations.get(call_site, 0)
+            }
+        return snapshot
+
+
+def record_escalation(call_site: str, reason: str) -> None:
+    """Count a call re-run on the strong model ("invalid_output" or "low_confidence")."""
+    LLM_ROUTE_ESCALATIONS.inc(call_site=call_site, reason=reason)
+    with _lock:
+        _escalations[call_site] = _escalations.get(call_site, 0) + 1
+
+
+async def call_with_escalation(
+    call: Callable[[str], Awaitable[Any]],
+    validate: Callable[[Any], T],
+    call_site: str,
+    model: str,
+    confident: Optional[Callable[[T], bool]] = None,
+    can_escalate: Optional[Callable[[], bool]] = None
+) -> T:
+    """
+    Run `call` on the routed model; if `validate` rejects the output, or
+    `confident` says the model wasn't sure of it, run it once more on the
+    strong model.
+
+    Args:
+        call: Makes one Claude call with the given model and returns its output
+        validate: Parses / checks the output, raising on bad output
+        call_site: Label for escalation metrics
+        model: The model chosen by choose_model
+        confident: Optional check of a validated result (e.g. confidence != "manual")
+        can_escalate: Optional check that a second call still fits the caller's
+            deadline; when it says no, a low-confidence result is returned as is
+
+    Returns:
+        The validated result. Errors from `call` itself (Claude unavailable,
+        API errors) are raised as-is, never escalated.
+
+    Raises:
+        ClaudeUnavailableError: The output was invalid and there was no time to escalate
+    """
+    output = await call(model)
+    if model == STRONG_MODEL:
+        return validate(output)
+
+    try:
+        result = validate(output)
+    except Exception:
+        reason = "invalid_output"
+    else:
+        if confident is None or confident(result):
+            return result
+        reason = "low_confidence"
+
+    if can_escalate is not None and not can_escalate():
+        if reason == "low_confidence":
+            return result
+        raise ClaudeUnavailableError(f"No time left to escalate invalid {call_site} output")
+
+    record_escalation(call_site, reason)
+    return validate(await call(STRONG_MODEL))
@@ -0,0 +1,341 @@
+"""
+Resilience - Retries, deadlines, hedging and a circuit breaker for Claude calls
+
+Upstream hiccups (429 rate limits, 529 overloaded, 5xx, timeouts, dropped
+connections) are retried with full-jitter exponential backoff, honoring the
+API's retry-after header, until the call's deadline. Optionally a hedged
+duplicate request is sent when an attempt runs past that call site's p95
+latency, and whichever finishes first wins.
+
+A shared circuit breaker counts consecutive upstream failures. Once it opens,
+calls fail fast with CircuitOpenError (instead of queueing behind a degraded
+API) so endpoints can serve cached or heuristic results; after a cool-down a
+single probe call decides whether to close it again.
+
+The SDK's own retries are disabled (max_retries=0 in llm_clients.py) so the
+two layers don't multiply.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from metrics import CLAUDE_CIRCUIT_OPEN, CLAUDE_HEDGED, CLAUDE_RETRIES
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeout, conflict, rate limit, server errors, overloaded
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+MAX_ATTEMPTS = int(os.getenv("CLAUDE_MAX_ATTEMPTS", 4))
+BACKOFF_BASE_SECONDS = float(os.getenv("CLAUDE_BACKOFF_BASE_SECONDS", 0.5))
+BACKOFF_MAX_SECONDS = float(os.getenv("CLAUDE_BACKOFF_MAX_SECONDS", 20))
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("CLAUDE_DEADLINE_SECONDS", 90))
+
+# Hedging doubles the cost of slow calls, so it is opt-in
+HEDGE_ENABLED = os.getenv("CLAUDE_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_MIN_SAMPLES = int(os.getenv("CLAUDE_HEDGE_MIN_SAMPLES", 20))
+
+# Overall budget per call site (all attempts + backoff). The answer endpoints
+# use theirs as the budget for the whole request - scheduler wait, escalation
+# and re-ask included - so answers arrive before the caller gives up on the
+# form (universal_apply.py waits 60s for /answer-questions)
+CALL_SITE_DEADLINES = {
+    "answer_question": 25.0,
+    "answer_questions": 55.0,
+    "analyze_job": 60.0,
+    "generate_tailored_resume": 180.0,
+}
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("CLAUDE_BREAKER_FAILURE_THRESHOLD", 5))
+BREAKER_RESET_SECONDS = float(os.getenv("CLAUDE_BREAKER_RESET_SECONDS", 30))
+
+
+class ClaudeUnavailableError(Exception):
+    """Claude could not be reached within the deadline (upstream degraded)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(ClaudeUnavailableError):
+    """The circuit breaker is open; the call was not attempted."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate limits, overload, server errors, timeouts and connection failures."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # anthropic.APITimeoutError / APIConnectionError carry no status code
+    return type(exc).__name__ in ("APITimeoutError", "APIConnectionError")
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Delay requested by the API's retry-after(-ms) header, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _failure_reason(exc: BaseException) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    status = getattr(exc, "status_code", None)
+    return str(status) if status is not None else type(exc).__name__
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Args:
+        name: Label for the applyfast_claude_circuit_open gauge
+        failure_threshold: Consecutive upstream failures that open the circuit
+        reset_seconds: How long the circuit stays open before a probe is allowed
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def retry_after(self) -> float:
+        """Seconds until a probe will be allowed."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now (in half-open state, only one probe at a time)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+        CLAUDE_CIRCUIT_OPEN.set(0, breaker=self.name)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                opened = True
+            else:
+                opened = False
+        if opened:
+            CLAUDE_CIRCUIT_OPEN.set(1, breaker=self.name)
+
+    def release_probe(self) -> None:
+        """The probe ended without telling us about upstream health (e.g. a 400)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            failures = self._failures
+        return {"state": self.state, "consecutiveFailures": failures, "retryAfter": round(self.retry_after(), 1)}
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+# Every call site talks to the same upstream, so they share one breaker
+claude_breaker = CircuitBreaker("anthropic")
+_latency: Dict[str, LatencyTracker] = {}
+
+
+def _tracker(call_site: str) -> LatencyTracker:
+    tracker = _latency.get(call_site)
+    if tracker is None:
+        tracker = _latency.setdefault(call_site, LatencyTracker())
+    return tracker
+
+
+def backoff_delay(attempt: int, exc: BaseException) -> float:
+    """Retry-after if the API sent one, else full-jitter exponential backoff."""
+    requested = retry_after_seconds(exc)
+    if requested is not None:
+        return requested
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+async def _attempt(call: Callable[[], Awaitable[T]], call_site: str, timeout: float, hedge: bool) -> T:
+    """One attempt, plus a hedged duplicate if it outlives the call site's p95."""
+    threshold = _tracker(call_site).p95() if hedge else None
+    if threshold is None or threshold >= timeout:
+        return await asyncio.wait_for(call(), timeout)
+
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + timeout
+    primary = asyncio.ensure_future(call())
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=threshold)
+        if done:
+            return primary.result()
+
+        CLAUDE_HEDGED.inc(call_site=call_site, outcome="sent")
+        pending.add(asyncio.ensure_future(call()))
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=give_up_at - loop.time(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                raise asyncio.TimeoutError()
+            for task in done:
+                if task.exception() is None:
+                    CLAUDE_HEDGED.inc(call_site=call_site, outcome="primary" if task is primary else "hedge")
+                    return task.result()
+                error = task.exception()
+        # Both requests failed
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_with_resilience(
+    call: Callable[[], Awaitable[T]],
+    call_site: str,
+    deadline: Optional[float] = None,
+    hedge: bool = HEDGE_ENABLED,
+    breaker: CircuitBreaker = claude_breaker
+) -> T:
+    """
+    Run a Claude call with retries, an overall deadline, optional hedging and
+    the circuit breaker.
+
+    Args:
+        call: Zero-argument coroutine factory that makes one upstream request
+        call_site: Label for metrics and per-call-site latency tracking
+        deadline: Seconds the whole call (all attempts and backoff) may take;
+            defaults to CALL_SITE_DEADLINES / CLAUDE_DEADLINE_SECONDS
+        hedge: Send a duplicate request when an attempt runs past p95
+
+    Raises:
+        CircuitOpenError: The breaker is open; nothing was sent
+        ClaudeUnavailableError: Retryable failures until attempts or the deadline ran out
+        Exception: Non-retryable errors (e.g. a 400) are raised unchanged
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("Claude API temporarily unavailable (circuit open)", breaker.retry_after())
+
+    deadline = deadline or CALL_SITE_DEADLINES.get(call_site, DEFAULT_DEADLINE_SECONDS)
+    give_up_at = time.monotonic() + deadline
+    attempt = 0
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                result = await _attempt(call, call_site, give_up_at - started, hedge)
+            except Exception as exc:
+                if not is_retryable(exc):
+                    raise
+                breaker.record_failure()
+                reason = _failure_reason(exc)
+                attempt += 1
+                delay = backoff_delay(attempt - 1, exc)
+                if attempt >= MAX_ATTEMPTS or breaker.state == "open" or time.monotonic() + delay >= give_up_at:
+                    raise ClaudeUnavailableError(
+                        f"Claude API unavailable after {attempt} attempt(s): {reason}",
+                        retry_after_seconds(exc) or breaker.retry_after() or None
+                    ) from exc
+                CLAUDE_RETRIES.inc(call_site=call_site, reason=reason)
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            _tracker(call_site).observe(time.monotonic() - started)
+            return result
+    finally:
+        # Non-retryable errors and cancellation say nothing about upstream
+        # health; let the next call probe if this one was the half-open probe
+        breaker.release_probe()
+
+
+@asynccontextmanager
+async def circuit_guard(breaker: CircuitBreaker = claude_breaker) -> AsyncIterator[None]:
+    """
+    Breaker bookkeeping for calls that can't simply be retried, such as a
+    streamed response already relaying text to the client: fail fast while
+    the circuit is open and count the outcome towards it.
+
+    Raises:
+        CircuitOpenError: The breaker is open; the body did not run
+    """
+    if not breaker.allow():
+        raise CircuitOpenError("Claude API temporarily unavailable (circuit open)", breaker.retry_after())
+    try:
+        yield
+    except Exception as exc:
+        if is_retryable(exc):
+            breaker.record_failure()
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        breaker.release_probe()
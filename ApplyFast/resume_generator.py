@@ -2,16 +2,25 @@
 Resume Generator - Tailored resume generation using Claude API
 """
 
-import os
-from typing import Dict, Any
-import anthropic
+import time
+from typing import Dict, Any, List, Tuple, AsyncIterator
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables before the modules below read their settings at import
 load_dotenv()
 
-# Initialize Anthropic client
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+from llm_clients import get_async_client, get_sync_client
+from singleflight import SingleFlight, make_flight_key
+from metrics import record_usage, track_claude_call
+from resilience import call_with_resilience, circuit_guard
+from llm_scheduler import LANE_RESUME, Reservation, estimate_request_tokens, llm_scheduler
+from model_router import choose_model, record_route_call, strip_short_cache_breakpoints
+
+# Anthropic clients are shared with apply_fast_api and built on first use
+# (sync for CLI usage, async for the API server) - see llm_clients.py
+
+# Concurrent requests for the same resume share one Claude call
+resume_flight = SingleFlight("generate_tailored_resume")
 
 # William Mongou's real profile - DO NOT MODIFY
 WILLIAM_PROFILE = {
@@ -141,31 +150,7 @@ def _get_dynamic_address(job_location: str) -> str:
     return "2712 Dennis Drive, Yukon, OK 73099"
 
 
-def generate_tailored_resume(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> str:
-    """
-    Generate a tailored resume using Claude API based on job requirements.
-
-    Args:
-        job_requirements: Dict containing job title, skills, requirements, etc.
-        user_profile: Optional user profile. If None, uses William Mongou's profile.
-
-    Returns:
-        Plain text formatted resume tailored to the job
-    """
-
-    # Use William's profile by default
-    if user_profile is None:
-        user_profile = WILLIAM_PROFILE
-
-    # Extract key info from job requirements
-    job_title = job_requirements.get('title', 'Software Engineer')
-    required_skills = job_requirements.get('skills', [])
-    job_description = job_requirements.get('description', '')
-    company = job_requirements.get('company', '')
-    job_location = job_requirements.get('location', '')
-
-    # Build the system prompt
-    system_prompt = """You are an expert resume writer. Your job is to create a tailored, ATS-friendly resume
+RESUME_SYSTEM_RULES = """You are an expert resume writer. Your job is to create a tailored, ATS-friendly resume
 that highlights the candidate's REAL experience and skills that match the job requirements.
 
 CRITICAL RULES - DO NOT VIOLATE:
@@ -182,13 +167,78 @@ CRITICAL RULES - DO NOT VIOLATE:
 If the candidate doesn't have a required skill or experience, DO NOT mention it.
 Focus on what they DO have that's relevant."""
 
+
+def _build_profile_block(user_profile: Dict[str, Any]) -> str:
+    """
+    Render the candidate profile as the stable part of the resume prompt.
+
+    Contains nothing job-specific (the contact line depends on job location and
+    lives in the user prompt), so it is byte-identical across calls and can be
+    served from the prompt cache.
+    """
+    profile_block = f"""CANDIDATE PROFILE (USE ONLY THIS INFORMATION):
+Name: {user_profile['name']}
+
+Work Experience:
+"""
+
+    # Add all work experience
+    for exp in user_profile['experience']:
+        profile_block += f"\n{exp['company']} - {exp['title']} ({exp['dates']})\n"
+        for achievement in exp['achievements']:
+            profile_block += f"  • {achievement}\n"
+
+    profile_block += f"""
+Skills: {user_profile['skills']}
+
+Education: {user_profile['education']}
+
+Certifications: {user_profile.get('certifications', 'None')}"""
+
+    return profile_block
+
+
+def _build_resume_prompts(job_requirements: Dict[str, Any], user_profile: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Build the system and user prompts for a tailored resume.
+
+    The system prompt (writing rules + candidate profile) is the cached prefix,
+    marked with cache_control; the user prompt carries only the job details.
+    The default profile comes to about 820 tokens, under the 1024 Sonnet
+    caches, so callers drop the breakpoint (strip_short_cache_breakpoints)
+    unless the profile is longer.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Candidate profile to draw experience from.
+
+    Returns:
+        Tuple of (system content blocks, user_prompt)
+    """
+
+    # Extract key info from job requirements
+    job_title = job_requirements.get('title', 'Software Engineer')
+    required_skills = job_requirements.get('skills', [])
+    job_description = job_requirements.get('description', '')
+    company = job_requirements.get('company', '')
+    job_location = job_requirements.get('location', '')
+
+    system_blocks = [
+        {"type": "text", "text": RESUME_SYSTEM_RULES},
+        {
+            "type": "text",
+            "text": _build_profile_block(user_profile),
+            "cache_control": {"type": "ephemeral"}
+        }
+    ]
+
     # Get dynamic address based on job location
     dynamic_address = _get_dynamic_address(job_location)
     phone_and_email = "(580) 447-9539 | williammongou@gmail.com"
     full_contact = f"{dynamic_address} | {phone_and_email}"
 
     # Build the user prompt
-    user_prompt = f"""Create a tailored resume for this job application.
+    user_prompt = f"""Create a tailored resume for this job application using the candidate profile above.
 
 JOB DETAILS:
 Title: {job_title}
@@ -199,28 +249,10 @@ Required Skills: {', '.join(required_skills) if required_skills else 'Not specif
 Job Description:
 {job_description}
 
-CANDIDATE PROFILE (USE ONLY THIS INFORMATION):
-Name: {user_profile['name']}
-Contact: {full_contact}
-
-Work Experience:
-"""
-
-    # Add all work experience
-    for exp in user_profile['experience']:
-        user_prompt += f"\n{exp['company']} - {exp['title']} ({exp['dates']})\n"
-        for achievement in exp['achievements']:
-            user_prompt += f"  • {achievement}\n"
-
-    user_prompt += f"""
-Skills: {user_profile['skills']}
-
-Education: {user_profile['education']}
-
-Certifications: {user_profile.get('certifications', 'None')}
+Contact line for the resume header: {full_contact}
 
 INSTRUCTIONS:
-1. Create a professional resume using ONLY the experience and skills listed above
+1. Create a professional resume using ONLY the experience and skills in the candidate profile
 2. Reorder bullet points within each job to highlight achievements matching the job requirements
 3. Emphasize relevant technologies and skills that appear in both the job description and profile
 4. Use action verbs and quantify results where already provided
@@ -229,19 +261,47 @@ INSTRUCTIONS:
 
 Return the complete resume as plain text."""
 
+    return system_blocks, user_prompt
+
+
+def generate_tailored_resume(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> str:
+    """
+    Generate a tailored resume using Claude API based on job requirements.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Optional user profile. If None, uses William Mongou's profile.
+
+    Returns:
+        Plain text formatted resume tailored to the job
+    """
+
+    # Use William's profile by default
+    if user_profile is None:
+        user_profile = WILLIAM_PROFILE
+
+    system_blocks, user_prompt = _build_resume_prompts(job_requirements, user_profile)
+
     # Call Claude API
-    message = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4000,
-        temperature=0.3,  # Lower temperature for more consistent output
-        system=system_prompt,
-        messages=[
-            {
-                "role": "user",
-                "content": user_prompt
-            }
-        ]
-    )
+    model = choose_model("generate_tailored_resume", estimate_request_tokens(user_prompt, system_blocks))
+    system_blocks, _ = strip_short_cache_breakpoints(model, system_blocks)
+    start = time.perf_counter()
+    with track_claude_call("generate_tailored_resume"):
+        message = get_sync_client().messages.create(
+            model=model,
+            max_tokens=4000,
+            temperature=0.3,  # Lower temperature for more consistent output
+            system=system_blocks,
+            messages=[
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ]
+        )
+
+    record_usage("generate_tailored_resume", message.usage)
+    record_route_call("generate_tailored_resume", model, time.perf_counter() - start, message.usage)
 
     # Extract the resume text
     resume_text = message.content[0].text
@@ -249,28 +309,68 @@ Return the complete resume as plain text."""
     return resume_text
 
 
-def generate_resume_with_analysis(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> Dict[str, Any]:
+async def generate_tailored_resume_async(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> str:
     """
-    Generate a tailored resume and provide analysis of the match.
+    Async variant of generate_tailored_resume for use inside the API event loop.
 
     Args:
         job_requirements: Dict containing job title, skills, requirements, etc.
         user_profile: Optional user profile. If None, uses William Mongou's profile.
 
     Returns:
-        Dict with:
-            - resumeText: The tailored resume
-            - matchScore: 0-100 score of how well profile matches job
-            - highlightedSkills: List of matching skills
-            - honestyConcerns: List of gaps or concerns
+        Plain text formatted resume tailored to the job
     """
 
     # Use William's profile by default
     if user_profile is None:
         user_profile = WILLIAM_PROFILE
 
-    # Generate the resume
-    resume_text = generate_tailored_resume(job_requirements, user_profile)
+    system_blocks, user_prompt = _build_resume_prompts(job_requirements, user_profile)
+
+    model = choose_model("generate_tailored_resume", estimate_request_tokens(user_prompt, system_blocks))
+    system_blocks, _ = strip_short_cache_breakpoints(model, system_blocks)
+
+    # Call Claude API without blocking the event loop
+    async def create(reservation: Reservation) -> str:
+        start = time.perf_counter()
+        with track_claude_call("generate_tailored_resume"):
+            message = await get_async_client().messages.create(
+                model=model,
+                max_tokens=4000,
+                temperature=0.3,  # Lower temperature for more consistent output
+                system=system_blocks,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": user_prompt
+                    }
+                ]
+            )
+        record_usage("generate_tailored_resume", message.usage)
+        record_route_call("generate_tailored_resume", model, time.perf_counter() - start, message.usage)
+        reservation.settle(message.usage)
+        return message.content[0].text
+
+    async def scheduled() -> str:
+        tokens = estimate_request_tokens(user_prompt, system_blocks, 4000)
+        async with llm_scheduler.reserve(LANE_RESUME, tokens) as reservation:
+            return await call_with_resilience(lambda: create(reservation), "generate_tailored_resume")
+
+    return await resume_flight.do(make_flight_key(model, system_blocks, user_prompt), scheduled)
+
+
+def _analyze_resume_match(job_requirements: Dict[str, Any], user_profile: Dict[str, Any], resume_text: str) -> Dict[str, Any]:
+    """
+    Score how well the profile matches the job and package it with the resume.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Candidate profile the resume was generated from.
+        resume_text: The generated resume text.
+
+    Returns:
+        Dict in the shape returned by generate_resume_with_analysis
+    """
 
     # Analyze the match
     required_skills = set(skill.lower().strip() for skill in job_requirements.get('skills', []))
@@ -342,6 +442,105 @@ def generate_resume_with_analysis(job_requirements: Dict[str, Any], user_profile
     }
 
 
+def generate_resume_with_analysis(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Generate a tailored resume and provide analysis of the match.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Optional user profile. If None, uses William Mongou's profile.
+
+    Returns:
+        Dict with:
+            - resumeText: The tailored resume
+            - matchScore: 0-100 score of how well profile matches job
+            - highlightedSkills: List of matching skills
+            - honestyConcerns: List of gaps or concerns
+    """
+
+    # Use William's profile by default
+    if user_profile is None:
+        user_profile = WILLIAM_PROFILE
+
+    # Generate the resume
+    resume_text = generate_tailored_resume(job_requirements, user_profile)
+
+    return _analyze_resume_match(job_requirements, user_profile, resume_text)
+
+
+async def generate_resume_with_analysis_async(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Async variant of generate_resume_with_analysis used by the API endpoints.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Optional user profile. If None, uses William Mongou's profile.
+
+    Returns:
+        Same dict shape as generate_resume_with_analysis
+    """
+
+    # Use William's profile by default
+    if user_profile is None:
+        user_profile = WILLIAM_PROFILE
+
+    resume_text = await generate_tailored_resume_async(job_requirements, user_profile)
+
+    return _analyze_resume_match(job_requirements, user_profile, resume_text)
+
+
+async def stream_resume_with_analysis(job_requirements: Dict[str, Any], user_profile: Dict[str, Any] = None) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream a tailored resume as Claude writes it, then the match analysis.
+
+    Args:
+        job_requirements: Dict containing job title, skills, requirements, etc.
+        user_profile: Optional user profile. If None, uses William Mongou's profile.
+
+    Yields:
+        ("chunk", text) for each piece of resume text as it arrives, followed by
+        one ("analysis", dict) in the shape returned by generate_resume_with_analysis
+    """
+
+    # Use William's profile by default
+    if user_profile is None:
+        user_profile = WILLIAM_PROFILE
+
+    system_blocks, user_prompt = _build_resume_prompts(job_requirements, user_profile)
+
+    # Text already relayed to the client can't be taken back, so the stream
+    # isn't retried; it only fails fast while the circuit is open
+    chunks = []
+    model = choose_model("generate_tailored_resume", estimate_request_tokens(user_prompt, system_blocks))
+    system_blocks, _ = strip_short_cache_breakpoints(model, system_blocks)
+    tokens = estimate_request_tokens(user_prompt, system_blocks, 4000)
+    async with circuit_guard(), llm_scheduler.reserve(LANE_RESUME, tokens) as reservation:
+        start = time.perf_counter()
+        with track_claude_call("generate_tailored_resume"):
+            async with get_async_client().messages.stream(
+                model=model,
+                max_tokens=4000,
+                temperature=0.3,  # Lower temperature for more consistent output
+                system=system_blocks,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": user_prompt
+                    }
+                ]
+            ) as stream:
+                async for text in stream.text_stream:
+                    chunks.append(text)
+                    yield "chunk", text
+
+                final_message = await stream.get_final_message()
+        reservation.settle(final_message.usage)
+    record_usage("generate_tailored_resume", final_message.usage)
+    record_route_call("generate_tailored_resume", model, time.perf_counter() - start, final_message.usage)
+
+    yield "analysis", _analyze_resume_match(job_requirements, user_profile, "".join(chunks))
+
+
 # Example usage and testing
 if __name__ == "__main__":
     print("=" * 70)
@@ -0,0 +1,68 @@
+"""
+Single-flight request coalescing for identical in-flight async calls
+
+When several callers ask for the same key while a call is already running,
+they all await the one upstream call instead of issuing their own.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+
+def make_flight_key(*parts: Any) -> str:
+    """
+    Hash arbitrary JSON-serializable call arguments into a coalescing key.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one shared task.
+
+    The shared task is shielded from cancellation, so a caller that gives up
+    (e.g. the browser tab closed) doesn't cancel the call for everyone else
+    waiting on it. Results are not cached once the call completes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() unless a call with the same key is already in flight, in
+        which case wait for that call's result (or exception) instead.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call/coalesce counters for observability."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "inFlight": len(self._inflight)
+        }
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished task so the next call for its key goes upstream."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -5,6 +5,11 @@ Run this after starting the API server to verify all endpoints work
 
 import requests
 import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 API_BASE = "http://localhost:8000"
@@ -17,6 +22,36 @@ def print_section(title):
     print("=" * 70)
 
 
+def _migrate_db(db_path):
+    """Run the schema migrations against db_path (in a worker process)"""
+    from migrations import migrate
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return migrate(conn)
+    finally:
+        conn.close()
+
+
+def test_concurrent_migrations(workers=4):
+    """Several workers starting at once on a fresh database must each migrate it without errors"""
+    print_section("Testing Concurrent Migrations")
+    from migrations import MIGRATIONS
+
+    latest = MIGRATIONS[-1][0]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "applyfast.db")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            versions = list(pool.map(_migrate_db, [db_path] * workers))
+        print(f"Schema versions reported by {workers} workers: {versions}")
+        assert versions == [latest] * workers
+        conn = sqlite3.connect(db_path)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(applications)")]
+        conn.close()
+        assert columns.count("canonical_url") == 1
+    print("✅ Concurrent migrations passed")
+
+
 def test_health_check():
     """Test the root health check endpoint"""
     print_section("Testing Health Check")
@@ -80,6 +115,42 @@ def test_analyze_job():
         return None
 
 
+def test_analyze_jobs():
+    """Test the batch analyze-jobs endpoint (NDJSON stream)"""
+    print_section("Testing Batch Job Analysis")
+
+    payload = {
+        "jobs": [
+            {"jobUrl": "https://example.com/job/201", "jobText": "Backend Engineer - Python, 3+ years, Remote"},
+            {"jobUrl": "https://example.com/job/202", "jobText": "Data Engineer - Spark, SQL, 5+ years, Austin, TX"},
+            {"jobUrl": "https://example.com/job/203", "jobText": "Cloud Architect - AWS, GCP, TS/SCI Clearance"}
+        ],
+        "concurrency": 2
+    }
+
+    print(f"Sending request to /analyze-jobs...")
+    response = requests.post(f"{API_BASE}/analyze-jobs", json=payload, stream=True)
+    print(f"Status: {response.status_code}")
+
+    if response.status_code == 200:
+        results = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            item = json.loads(line)
+            results.append(item)
+            if item.get("ok"):
+                print(f"  [{item['index']}] {item['result'].get('title')} @ {item['result'].get('company')}")
+            else:
+                print(f"  [{item['index']}] ❌ {item.get('error')}")
+        assert len(results) == len(payload["jobs"])
+        print("✅ Batch job analysis passed")
+        return results
+    else:
+        print(f"❌ Error: {response.text}")
+        return None
+
+
 def test_generate_resume():
     """Test the generate-resume endpoint"""
     print_section("Testing Resume Generation")
@@ -128,6 +199,55 @@ def test_generate_resume():
         return None
 
 
+def test_generate_resume_stream():
+    """Test the SSE generate-resume/stream endpoint"""
+    print_section("Testing Streaming Resume Generation")
+
+    payload = {
+        "jobRequirements": {
+            "title": "Senior Software Engineer",
+            "skills": ["Python", "FastAPI", "PostgreSQL"],
+            "experience": "5+ years"
+        },
+        "userProfile": {}
+    }
+
+    print(f"Sending request to /generate-resume/stream...")
+    start = time.time()
+    response = requests.post(f"{API_BASE}/generate-resume/stream", json=payload, stream=True)
+    print(f"Status: {response.status_code}")
+
+    if response.status_code != 200:
+        print(f"❌ Error: {response.text}")
+        return None
+
+    first_chunk_at = None
+    chunks = 0
+    analysis = None
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            data = json.loads(line[len("data: "):])
+            if event == "chunk":
+                chunks += 1
+                if first_chunk_at is None:
+                    first_chunk_at = time.time() - start
+            elif event == "analysis":
+                analysis = data
+            elif event == "error":
+                print(f"❌ Error event: {data.get('detail')}")
+                return None
+
+    print(f"\n  Time to first chunk: {first_chunk_at:.2f}s" if first_chunk_at else "\n  No chunks received")
+    print(f"  Chunks received: {chunks}")
+    print(f"  Match Score: {analysis.get('matchScore') if analysis else None}%")
+    assert analysis is not None
+    print("✅ Streaming resume generation passed")
+    return analysis
+
+
 def test_answer_question():
     """Test the answer-question endpoint"""
     print_section("Testing Question Answering")
@@ -162,6 +282,77 @@ def test_answer_question():
         return None
 
 
+def test_answer_questions():
+    """Test the answer-questions endpoint (a whole form page in one call)"""
+    print_section("Testing Multi-Question Answering")
+
+    payload = {
+        "questions": [
+            {"fieldId": "work_auth", "question": "Are you authorized to work in the US?"},
+            {"fieldId": "sponsorship", "question": "Will you now or in the future require visa sponsorship?"},
+            {"fieldId": "why_us", "question": "Why do you want to work at our company?"}
+        ],
+        "userProfile": {
+            "name": "John Doe",
+            "interests": ["distributed systems", "AI/ML"],
+            "workAuthorization": "US Citizen"
+        },
+        "jobContext": {
+            "company": "Acme Corp",
+            "title": "Senior Software Engineer"
+        }
+    }
+
+    print(f"Sending request to /answer-questions...")
+    response = requests.post(f"{API_BASE}/answer-questions", json=payload)
+    print(f"Status: {response.status_code}")
+
+    if response.status_code == 200:
+        answers = response.json()["answers"]
+        assert set(answers) == {"work_auth", "sponsorship", "why_us"}
+        for field_id, answer in answers.items():
+            print(f"  {field_id} [{answer['confidence']}]: {answer['answer'][:80]}")
+        print("✅ Multi-question answering passed")
+        return answers
+    else:
+        print(f"❌ Error: {response.text}")
+        return None
+
+
+def test_answer_overrides():
+    """Test answer overrides taking precedence over Claude"""
+    print_section("Testing Answer Overrides")
+
+    override = {
+        "question": "Why do you want to work at Acme Corp?",
+        "answer": "I've used {{company}}'s products for years.",
+        "company": "Acme Corp"
+    }
+
+    print(f"Sending request to /answer-overrides...")
+    response = requests.post(f"{API_BASE}/answer-overrides", json=override)
+    print(f"Status: {response.status_code}")
+
+    if response.status_code != 200:
+        print(f"❌ Error: {response.text}")
+        return None
+
+    override_id = response.json()["id"]
+    payload = {
+        "question": "Why do you want to work at Acme Corp? *",
+        "userProfile": {"name": "John Doe"},
+        "jobContext": {"company": "Acme Corp", "title": "Senior Software Engineer"}
+    }
+    answer = requests.post(f"{API_BASE}/answer-question", json=payload).json()
+    assert answer == {"answer": "I've used Acme Corp's products for years.", "confidence": "auto"}
+
+    response = requests.delete(f"{API_BASE}/answer-overrides/{override_id}")
+    assert response.status_code == 200
+    print(f"Answer store: {requests.get(f'{API_BASE}/cache/stats').json()['answerStore']}")
+    print("✅ Answer overrides passed")
+    return answer
+
+
 def test_log_application():
     """Test the log-application endpoint"""
     print_section("Testing Application Logging")
@@ -196,6 +387,39 @@ def test_log_application():
         return None
 
 
+def test_log_applications():
+    """Test the bulk log-applications endpoint"""
+    print_section("Testing Bulk Application Logging")
+
+    payload = {
+        "applications": [
+            {
+                "jobUrl": f"https://example.com/job/bulk-{i}",
+                "company": "Bulk Test Corp",
+                "title": f"Engineer {i}",
+                "status": "applied",
+                "timestamp": datetime.now().isoformat()
+            }
+            for i in range(3)
+        ]
+    }
+
+    print(f"Sending request to /log-applications...")
+    response = requests.post(f"{API_BASE}/log-applications", json=payload)
+    print(f"Status: {response.status_code}")
+
+    if response.status_code == 200:
+        data = response.json()
+        print(f"\nApplications Logged:")
+        print(f"  Success: {data.get('success')}")
+        print(f"  Application IDs: {data.get('applicationIds')}")
+        print("✅ Bulk application logging passed")
+        return data.get('applicationIds')
+    else:
+        print(f"❌ Error: {response.text}")
+        return None
+
+
 def test_get_applications():
     """Test the get applications endpoint"""
     print_section("Testing Get Applications")
@@ -216,6 +440,21 @@ def test_get_applications():
             print(f"    Title: {app.get('title')}")
             print(f"    Status: {app.get('status')}")
             print(f"    Timestamp: {app.get('timestamp')}")
+
+        # Small keyset pages, so a page boundary falls between the bulk-logged rows sharing one created_at
+        first_page = requests.get(f"{API_BASE}/applications", params={"limit": 2})
+        next_cursor = first_page.headers.get("X-Next-Cursor")
+        if next_cursor:
+            next_page = requests.get(f"{API_BASE}/applications", params={"limit": 2, "cursor": next_cursor})
+            assert next_page.status_code == 200
+            assert next_page.json(), "Page 2 is empty although page 1 returned a cursor"
+            overlap = {a["id"] for a in first_page.json()} & {a["id"] for a in next_page.json()}
+            print(f"\n  Next page: {len(next_page.json())} applications, {len(overlap)} repeated")
+            assert not overlap, f"Pages 1 and 2 share applications {sorted(overlap)}"
+            keys = [(a["created_at"], a["id"]) for a in first_page.json() + next_page.json()]
+            assert keys == sorted(keys, reverse=True), "Page 2 does not continue where page 1 ended"
+            whole = requests.get(f"{API_BASE}/applications", params={"limit": len(keys)}).json()
+            assert [(a["created_at"], a["id"]) for a in whole] == keys, "Cursor pages skipped applications"
         print("✅ Get applications passed")
         return data
     else:
@@ -272,6 +511,7 @@ def run_all_tests():
 
     try:
         # Basic tests
+        test_concurrent_migrations()
         test_health_check()
 
         # AI-powered endpoints (require Claude API key)
@@ -279,17 +519,24 @@ def run_all_tests():
         input("Press Enter to continue with AI tests, or Ctrl+C to skip...")
 
         test_analyze_job()
+        test_analyze_jobs()
         test_generate_resume()
+        test_generate_resume_stream()
         test_answer_question()
+        test_answer_questions()
+        test_answer_overrides()
 
         # Database tests
         application_id = test_log_application()
+        bulk_ids = test_log_applications()
         test_get_applications()
         test_get_stats()
 
         # Cleanup
         if application_id:
             test_delete_application(application_id)
+        for bulk_id in bulk_ids or []:
+            test_delete_application(bulk_id)
 
         print("\n" + "=" * 70)
         print("  ✅ All tests passed!")
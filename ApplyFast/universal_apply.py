@@ -36,6 +36,9 @@ except ImportError:
 # API configuration
 API_BASE = "http://localhost:8000"
 
+# /answer-questions rejects more than this many questions per request (ANSWER_QUESTIONS_MAX)
+ANSWER_QUESTIONS_BATCH = 25
+
 # User profile for auto-fill
 USER_PROFILE = {
     "name": "William Mongou",
@@ -580,39 +583,55 @@ async def fill_standard_fields(page: Page, job_location: str = "") -> int:
     return filled_count
 
 
-async def answer_screening_question(question: str, job_context: Dict[str, Any]) -> Optional[str]:
-    """Call API to answer screening question"""
+async def answer_screening_questions(questions: Dict[str, str], job_context: Dict[str, Any]) -> Dict[str, str]:
+    """Answer all screening questions on a page, keyed by field, ANSWER_QUESTIONS_BATCH per API call"""
+    items = list(questions.items())
+    answers: Dict[str, str] = {}
+    for start in range(0, len(items), ANSWER_QUESTIONS_BATCH):
+        answers.update(await answer_question_batch(dict(items[start:start + ANSWER_QUESTIONS_BATCH]), job_context))
+    return answers
+
+
+async def answer_question_batch(questions: Dict[str, str], job_context: Dict[str, Any]) -> Dict[str, str]:
+    """Call API once to answer a batch of screening questions, keyed by field"""
     try:
         response = requests.post(
-            f"{API_BASE}/answer-question",
+            f"{API_BASE}/answer-questions",
             json={
-                "question": question,
+                "questions": [
+                    {"fieldId": field_key, "question": question}
+                    for field_key, question in questions.items()
+                ],
                 "userProfile": USER_PROFILE,
                 "jobContext": job_context
             },
-            timeout=30
+            timeout=60
         )
 
         if response.status_code == 200:
-            data = response.json()
-            return data.get('answer')
+            answers = response.json().get('answers', {})
+            return {field_key: answer['answer'] for field_key, answer in answers.items() if answer.get('answer')}
         else:
             print(f"  ⚠️  API error: {response.status_code}")
-            return None
+            return {}
     except Exception as e:
         print(f"  ⚠️  Failed to call API: {e}")
-        return None
+        return {}
 
 
 async def handle_screening_questions(page: Page, job_context: Dict[str, Any]) -> int:
-    """Handle additional screening questions using AI"""
+    """Handle additional screening questions using AI (one API call per batch of questions on a page)"""
     print("\n🤔 Looking for screening questions...")
     answered_count = 0
 
     # Find all textareas and long text inputs
     text_fields = await page.query_selector_all('textarea, input[type="text"]')
 
-    for field in text_fields:
+    # Collect every unanswered question first, keyed by a per-page field key
+    fields: Dict[str, ElementHandle] = {}
+    questions: Dict[str, str] = {}
+
+    for index, field in enumerate(text_fields):
         try:
             # Check if already filled
             current_value = await field.input_value()
@@ -647,19 +666,33 @@ async def handle_screening_questions(page: Page, job_context: Dict[str, Any]) ->
             if any(pattern in question.lower() for pattern in skip_patterns):
                 continue
 
+            field_key = field_id or field_name or f"field-{index}"
+            if field_key in fields:
+                field_key = f"{field_key}-{index}"
+
             print(f"\n  ❓ Question: {question}")
+            fields[field_key] = field
+            questions[field_key] = question
 
-            # Call API for answer
-            answer = await answer_screening_question(question, job_context)
+        except Exception as e:
+            continue
+
+    if not questions:
+        return 0
+
+    # Call API for all answers at once
+    answers = await answer_screening_questions(questions, job_context)
 
+    for field_key, field in fields.items():
+        answer = answers.get(field_key)
+        try:
             if answer:
                 await field.fill(answer)
                 print(f"  ✅ Answered: {answer[:100]}...")
                 answered_count += 1
                 await human_delay(0.5, 1.0)
             else:
-                print(f"  ⚠️  Could not generate answer - may need manual input")
-
+                print(f"  ⚠️  Could not generate answer for '{questions[field_key][:60]}' - may need manual input")
         except Exception as e:
             continue
 
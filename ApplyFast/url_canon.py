@@ -0,0 +1,137 @@
+"""
+URL Canonicalization - One stable key per job posting URL
+
+The same posting shows up under many URLs: LinkedIn appends refId/trackingId,
+Indeed search results link with vjk= instead of jk=, ATS pages add /apply and
+utm_* parameters, Workday inserts a locale segment. canonicalize_job_url()
+reduces each to the platform's job identifier so applications can be
+deduplicated with a unique index and "already applied?" checks are one lookup.
+
+Canonical URLs have no scheme: "linkedin.com/jobs/view/3812345678".
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# Query parameters that never identify a posting
+_TRACKING_PARAMS = {
+    "refid", "trackingid", "trk", "trkinfo", "lipi", "midtoken", "midsig", "eid", "ebp", "recommendedflavor",
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer", "src", "source", "sourcetype",
+    "from", "tk", "from_site", "gh_src", "lever-origin", "lever-source", "iis", "iisn", "mobile",
+    "in_iframe",
+}
+
+_LINKEDIN_JOB_ID = re.compile(r"/jobs/view/(?:[^/?#]*?-)?(\d{6,})")
+_GREENHOUSE_PATH = re.compile(r"^/([^/]+)/jobs/(\d+)")
+_LEVER_PATH = re.compile(r"^/([^/]+)/([0-9a-f-]{36})", re.I)
+_WORKDAY_REQ = re.compile(r"/job/(?:[^/]*/)*[^/]*_([A-Za-z0-9-]+)/?$")
+_APPLY_SUFFIX = re.compile(r"/apply(?:/.*)?$", re.I)
+_ICIMS_JOB_ID = re.compile(r"/jobs/(\d+)")
+
+
+def _host(parsed) -> str:
+    host = (parsed.hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _query(parsed) -> Dict[str, str]:
+    """Query parameters with lowercased names (first value wins)"""
+    params: Dict[str, str] = {}
+    for name, value in parse_qsl(parsed.query, keep_blank_values=False):
+        params.setdefault(name.lower(), value)
+    return params
+
+
+def _linkedin(parsed) -> Optional[str]:
+    job_id = _query(parsed).get("currentjobid")
+    match = _LINKEDIN_JOB_ID.search(parsed.path)
+    if match:
+        job_id = match.group(1)
+    return f"linkedin.com/jobs/view/{job_id}" if job_id and job_id.isdigit() else None
+
+
+def _indeed(parsed) -> Optional[str]:
+    params = _query(parsed)
+    job_key = params.get("jk") or params.get("vjk")
+    return f"indeed.com/viewjob?jk={job_key.lower()}" if job_key else None
+
+
+def _greenhouse(parsed) -> Optional[str]:
+    params = _query(parsed)
+    match = _GREENHOUSE_PATH.match(parsed.path)
+    if match:
+        return f"greenhouse.io/{match.group(1).lower()}/jobs/{match.group(2)}"
+    # Embedded boards: /embed/job_app?for=<board>&token=<job id>
+    if params.get("for") and params.get("token"):
+        return f"greenhouse.io/{params['for'].lower()}/jobs/{params['token']}"
+    return None
+
+
+def _lever(parsed) -> Optional[str]:
+    match = _LEVER_PATH.match(parsed.path)
+    return f"jobs.lever.co/{match.group(1).lower()}/{match.group(2).lower()}" if match else None
+
+
+def _workday(parsed) -> Optional[str]:
+    # <tenant>.wd5.myworkdayjobs.com/en-US/<site>/job/<location>/<Title>_R12345[/apply]
+    match = _WORKDAY_REQ.search(_APPLY_SUFFIX.sub("", parsed.path))
+    if not match:
+        return None
+    tenant = _host(parsed).split(".")[0]
+    return f"{tenant}.myworkdayjobs.com/job/{match.group(1).upper()}"
+
+
+def _icims(parsed) -> Optional[str]:
+    match = _ICIMS_JOB_ID.search(parsed.path)
+    return f"{_host(parsed)}/jobs/{match.group(1)}" if match else None
+
+
+# (host suffix, canonicalizer) - first match wins
+_PLATFORMS: List[Tuple[str, Callable]] = [
+    ("linkedin.com", _linkedin),
+    ("indeed.com", _indeed),
+    ("greenhouse.io", _greenhouse),
+    ("lever.co", _lever),
+    ("myworkdayjobs.com", _workday),
+    ("icims.com", _icims),
+]
+
+
+def _generic(parsed) -> str:
+    """Any other site: host + path + non-tracking query, sorted, without the fragment"""
+    path = re.sub(r"/+$", "", parsed.path) or ""
+    params = sorted(
+        (name, value) for name, value in parse_qsl(parsed.query)
+        if name.lower() not in _TRACKING_PARAMS and not name.lower().startswith("utm_")
+    )
+    # Identifying parameters (e.g. gh_jid on company-hosted Greenhouse boards) are kept
+    query = f"?{urlencode(params)}" if params else ""
+    return f"{_host(parsed)}{path}{query}"
+
+
+def canonicalize_job_url(job_url: str) -> Optional[str]:
+    """
+    Reduce a job posting URL to its canonical form.
+
+    Args:
+        job_url: Raw URL as scraped or logged (scheme optional)
+
+    Returns:
+        Canonical URL without scheme, or None for a blank URL
+    """
+    job_url = (job_url or "").strip()
+    if not job_url:
+        return None
+    if "://" not in job_url:
+        job_url = f"https://{job_url}"
+
+    parsed = urlparse(job_url)
+    host = _host(parsed)
+    for suffix, canonicalize in _PLATFORMS:
+        if host == suffix or host.endswith(f".{suffix}"):
+            canonical = canonicalize(parsed)
+            if canonical:
+                return canonical
+            break
+    return _generic(parsed)